@@ -1,17 +1,17 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 import environ
-
-
-env = environ.Env()
-environ.Env.read_env()
-load_dotenv()
+from kombu import Exchange, Queue
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Переменные окружения из .env читаются один раз, здесь; остальные модули
+# берут значения из settings.
+env = environ.Env()
+environ.Env.read_env(BASE_DIR / ".env")
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -112,6 +112,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'users.authentication.IsActiveAndNotArchived',  # кастомный permission, если хочешь дополнительную защиту
     ),
+    # JSON на orjson (users.renderers / users.parsers), без orjson — стандартный json.
+    # Для JSON:API-вью есть FastJSONAPIRenderer и FastJSONAPIParser.
+    'DEFAULT_RENDERER_CLASSES': (
+        'users.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'users.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Сколько доверенных прокси стоит перед приложением. 0 — IP клиента берётся
+    # из REMOTE_ADDR, а X-Forwarded-For, который клиент может подделать,
+    # игнорируется (иначе лимиты по IP обходятся сменой заголовка).
+    'NUM_PROXIES': env.int("NUM_PROXIES", default=0),
+    # Лимиты для users.throttles (скользящее окно в кэше)
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': env("THROTTLE_LOGIN_IP", default="30/min"),
+        'login_email': env("THROTTLE_LOGIN_EMAIL", default="5/min"),
+        'invite_sender': env("THROTTLE_INVITE_SENDER", default="60/hour"),
+    },
+}
+
+SIMPLE_JWT = {
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.CustomTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.CustomTokenRefreshSerializer",
 }
 
 DJOSER = {
@@ -161,13 +187,80 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 
 REDIS_HOST = os.getenv('REDIS_HOST', '127.0.0.1')
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{REDIS_HOST}:6379/2",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": f"redis://{REDIS_HOST}:6379/3",
+    },
+}
+
+# Сессии читаются из Redis, запись идёт и в Redis, и в БД (write-through);
+# если Redis недоступен, users.sessions читает и пишет сессию через django_session.
+SESSION_ENGINE = env("SESSION_ENGINE", default="users.sessions")
+SESSION_CACHE_ALIAS = "sessions"
+
+AUTHENTICATION_BACKENDS = ["users.backends.CachedModelBackend"]
+# Кэш пользователя сессии в памяти процесса (0 — выключен)
+SESSION_USER_CACHE_TTL = env.int("SESSION_USER_CACHE_TTL", default=30)
+SESSION_USER_CACHE_SIZE = 1024
+# Кэш прав пользователей (has_perm) в Django cache, сбрасывается сигналами
+PERMISSION_CACHE_TIMEOUT = 60 * 10
+
+SESSION_CLEANUP_BATCH_SIZE = 1000
+SESSION_CLEANUP_MAX_BATCHES = 100
+
 CELERY_BROKER_URL = f'redis://{REDIS_HOST}:6379/0'
-CELERY_RESULT_BACKEND = f'redis://{REDIS_HOST}:6379/0'
-CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 3600}
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": 3600,
+    # Приоритеты 0 (высший) .. 9 внутри очереди
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+
+# Результаты задач никто не читает — не пишем их в Redis
+CELERY_TASK_IGNORE_RESULT = True
+
+# Очереди: приглашения, массовая почта и служебные задачи обслуживаются
+# отдельными воркерами (см. docker-compose.yml), поэтому большая рассылка
+# не задерживает письма-приглашения. Очередь invites обслуживает и остальную
+# транзакционную почту через EMAIL_BACKEND (сброс пароля, активация, письма
+# админам); в bulk_mail — только явные рассылки через send_email_celery.
+CELERY_TASK_QUEUES = (
+    Queue("invites", Exchange("invites"), routing_key="invites"),
+    Queue("bulk_mail", Exchange("bulk_mail"), routing_key="bulk_mail"),
+    Queue("maintenance", Exchange("maintenance"), routing_key="maintenance"),
+)
+CELERY_TASK_DEFAULT_QUEUE = "maintenance"
+CELERY_TASK_ROUTES = {
+    "users.tasks.send_invite_email": {"queue": "invites", "priority": 0},
+    "users.tasks.send_transactional_email": {"queue": "invites", "priority": 1},
+    "users.tasks.send_email_celery": {"queue": "bulk_mail", "priority": 6},
+    "users.tasks.flush_login_audit": {"queue": "maintenance", "priority": 5},
+    "users.tasks.cleanup_expired_sessions": {"queue": "maintenance", "priority": 9},
+}
+
+# SMTP-задачи долгие: воркер берёт по одной задаче и подтверждает её
+# после выполнения, чтобы задачи не простаивали в prefetch занятого процесса.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+CELERY_BEAT_SCHEDULE = {
+    "cleanup-expired-sessions": {
+        "task": "users.tasks.cleanup_expired_sessions",
+        "schedule": 60 * 60,
+    },
+}
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 EMAIL_BACKEND = "users.email_backend.CeleryEmail"
+# Бэкенд, которым задачи Celery реально отправляют письма (EMAIL_BACKEND
+# только ставит их в очередь).
+TASK_EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.yandex.ru"
 EMAIL_PORT = 465
 EMAIL_HOST_USER = env("EMAIL_NAME")
@@ -177,4 +270,28 @@ EMAIL_USE_TLS = False
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
 EMAIL_ADMIN = EMAIL_HOST_USER
-EMAIL_BATCH_SIZE = 10
\ No newline at end of file
+EMAIL_BATCH_SIZE = 10
+
+# Размер пачки для массовых действий в админке (один UPDATE на пачку)
+ADMIN_BULK_BATCH_SIZE = env.int("ADMIN_BULK_BATCH_SIZE", default=500)
+
+# Аудит входов: last_login пишется не чаще раза в N минут на пользователя,
+# строки аудита копятся в процессе и пишутся пачкой фоновой задачей.
+LOGIN_AUDIT_ENABLED = env.bool("LOGIN_AUDIT_ENABLED", default=True)
+LAST_LOGIN_UPDATE_INTERVAL = env.int("LAST_LOGIN_UPDATE_INTERVAL", default=15)
+LOGIN_AUDIT_BATCH_SIZE = env.int("LOGIN_AUDIT_BATCH_SIZE", default=100)
+LOGIN_AUDIT_FLUSH_INTERVAL = env.int("LOGIN_AUDIT_FLUSH_INTERVAL", default=30)
+
+# Отзыв JWT: JTI в Redis с TTL до истечения токена + Bloom-фильтр в процессе
+TOKEN_REVOCATION_REDIS_URL = f"redis://{REDIS_HOST}:6379/1"
+# Короткие таймауты: недоступный Redis должен давать быстрый отказ, а не
+# подвешивать все запросы с JWT на TCP-таймаут ОС (секунды)
+TOKEN_REVOCATION_SOCKET_TIMEOUT = 0.5
+TOKEN_REVOCATION_SYNC_INTERVAL = env.int("TOKEN_REVOCATION_SYNC_INTERVAL", default=30)
+TOKEN_REVOCATION_BLOOM_SIZE = 2 ** 20
+TOKEN_REVOCATION_BLOOM_HASHES = 7
+
+# Idempotency-Key для приглашений: сколько хранится первый ответ и сколько
+# живёт замок на время обработки первого запроса (секунды)
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", default=60 * 60 * 24)
+IDEMPOTENCY_LOCK_TIMEOUT = 10
@@ -0,0 +1,27 @@
+"""
+Облегчённый профиль настроек для Celery-воркеров.
+
+Воркеры только отправляют почту и выполняют фоновые задачи, поэтому админка,
+DRF/djoser/JSON:API, статика и middleware им не нужны: без них django.setup()
+импортирует заметно меньше модулей и воркер стартует быстрее.
+
+    DJANGO_SETTINGS_MODULE=CalculateBase_backend.settings_worker celery -A CalculateBase_backend worker
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS
+
+WEB_ONLY_APPS = {
+    "django.contrib.admin",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "rest_framework.authtoken",
+    "rest_framework",
+    "rest_framework_json_api",
+    "djoser",
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WEB_ONLY_APPS]
+
+MIDDLEWARE = []
+
+ROOT_URLCONF = "CalculateBase_backend.urls_worker"
@@ -0,0 +1,2 @@
+# Воркерам URL не нужны; пустой URLconf вместо urls.py с админкой и DRF
+urlpatterns = []
@@ -3,18 +3,23 @@ from django.utils import timezone
 from django.contrib import admin
 from django.conf import settings
 from django.contrib import messages
+from django.db import transaction
 from django.utils.html import format_html
 
 from .mixins import AuditLogMixin
 from .models import User, UserInvite, AuditLog
-from .tasks import send_email_celery
+from .search import TrigramSearchMixin
+from . import counters
+from .signals import users_bulk_updated
+from .tasks import send_invite_email
+from .utils import chunked
 from django.template.loader import render_to_string
 import uuid
 from .forms import SendInviteAdminForm
 
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin, AuditLogMixin):
+class UserAdmin(TrigramSearchMixin, admin.ModelAdmin, AuditLogMixin):
     add_form = SendInviteAdminForm
 
     list_display = (
@@ -41,6 +46,13 @@ class UserAdmin(admin.ModelAdmin, AuditLogMixin):
         ("updated_at", DateFieldListFilter),
     )
 
+    actions = (
+        "archive_users",
+        "unarchive_users",
+        "deactivate_users",
+        "resend_invites",
+    )
+
     def confirmed_display(self, obj):
         if obj.is_active:
             return format_html('<span style="color: green;">✔ Подтверждён</span>')
@@ -53,6 +65,99 @@ class UserAdmin(admin.ModelAdmin, AuditLogMixin):
         return format_html('<span style="color: green;">🟢 Активный</span>')
     active_display.short_description = "Статус"
 
+    @admin.action(description="Архивировать выбранных пользователей", permissions=["change"])
+    def archive_users(self, request, queryset):
+        count = self._bulk_update(request, queryset, AuditLog.ACTION_ARCHIVE_USER, is_archived=True)
+        messages.success(request, f"Архивировано пользователей: {count}")
+
+    @admin.action(description="Вернуть выбранных пользователей из архива", permissions=["change"])
+    def unarchive_users(self, request, queryset):
+        count = self._bulk_update(request, queryset, AuditLog.ACTION_UNARCHIVE_USER, is_archived=False)
+        messages.success(request, f"Возвращено из архива: {count}")
+
+    @admin.action(description="Деактивировать выбранных пользователей", permissions=["change"])
+    def deactivate_users(self, request, queryset):
+        count = self._bulk_update(request, queryset, AuditLog.ACTION_DEACTIVATE_USER, is_active=False)
+        messages.success(request, f"Деактивировано пользователей: {count}")
+
+    @admin.action(description="Повторно отправить приглашение", permissions=["change"])
+    def resend_invites(self, request, queryset):
+        user_ids = list(queryset.filter(is_active=False, is_archived=False).values_list("pk", flat=True))
+        count = 0
+
+        for batch in chunked(user_ids, settings.ADMIN_BULK_BATCH_SIZE):
+            with transaction.atomic():
+                users = list(User.objects.filter(pk__in=batch).only("id", "email", "name", "role"))
+                UserInvite.objects.filter(user_id__in=batch).delete()
+                expires_at = timezone.now() + timezone.timedelta(days=3)
+                invites = UserInvite.objects.bulk_create([
+                    UserInvite(user=user, invite_token=uuid.uuid4(), expires_at=expires_at)
+                    for user in users
+                ])
+                self.log_actions_bulk(
+                    user=request.user,
+                    action=AuditLog.ACTION_RESEND_INVITE,
+                    module="users",
+                    objs=users
+                )
+
+            emails = [self._build_invite_email(invite.user, invite) for invite in invites]
+            # Приоритет ниже, чем у одиночных приглашений из формы и API
+            for emails_chunk in chunked(emails, settings.EMAIL_BATCH_SIZE):
+                send_invite_email.apply_async(args=[emails_chunk], priority=3)
+            count += len(users)
+
+        messages.success(request, f"Приглашения отправлены повторно: {count}")
+
+    def _bulk_update(self, request, queryset, action, **fields):
+        """
+        Массовое изменение флагов пользователей пачками по ADMIN_BULK_BATCH_SIZE:
+        на пачку один UPDATE и один bulk_create записей аудита в короткой
+        транзакции, чтобы не держать блокировки users_user надолго. Строки
+        пачки блокируются при чтении, чтобы параллельный save() не сбил счётчики.
+        """
+        user_ids = list(queryset.exclude(**fields).values_list("pk", flat=True))
+        count = 0
+
+        for batch in chunked(user_ids, settings.ADMIN_BULK_BATCH_SIZE):
+            with transaction.atomic():
+                users = list(
+                    User.objects.select_for_update().filter(pk__in=batch).exclude(**fields)
+                    .only("id", "email", "role", "is_active", "is_archived")
+                )
+                changed_ids = [user.pk for user in users]
+                User.objects.filter(pk__in=changed_ids).update(updated_at=timezone.now(), **fields)
+                counters.record_bulk_update(users, fields)
+                self.log_actions_bulk(
+                    user=request.user,
+                    action=action,
+                    module="users",
+                    objs=users,
+                    changes=fields
+                )
+
+            users_bulk_updated.send(sender=User, user_ids=changed_ids, fields=fields)
+            count += len(changed_ids)
+
+        return count
+
+    def _build_invite_email(self, user, invite):
+        invite_link = f"http://localhost:8000/users/invite/confirm_page/{invite.invite_token}/"
+        html_content = render_to_string("emails/invite_user.html", {
+            "name": user.name or "пользователь",
+            "invite_link": invite_link
+        })
+
+        text_content = f"""Здравствуйте!\n\nВас пригласили в систему. Пройдите по ссылке для регистрации:\n{invite_link}\n\nЕсли вы не ожидали это письмо — проигнорируйте его."""
+
+        return {
+            "subject": "Приглашение в систему",
+            "body": text_content,
+            "from_email": settings.EMAIL_HOST_USER,
+            "to": [user.email],
+            "alternatives": [(html_content, "text/html")]
+        }
+
     def get_fieldsets(self, request, obj=None):
         if not obj:
             return [(None, {'fields': ('email', 'name', 'role')})]
@@ -70,23 +175,7 @@ class UserAdmin(admin.ModelAdmin, AuditLogMixin):
                 expires_at=timezone.now() + timezone.timedelta(days=3)
             )
 
-            invite_link = f"http://localhost:8000/users/invite/confirm_page/{invite.invite_token}/"
-            html_content = render_to_string("emails/invite_user.html", {
-                "name": obj.name or "пользователь",
-                "invite_link": invite_link
-            })
-
-            text_content = f"""Здравствуйте!\n\nВас пригласили в систему. Пройдите по ссылке для регистрации:\n{invite_link}\n\nЕсли вы не ожидали это письмо — проигнорируйте его."""
-
-            email_data = {
-                "subject": "Приглашение в систему",
-                "body": text_content,
-                "from_email": settings.EMAIL_HOST_USER,
-                "to": [obj.email],
-                "alternatives": [(html_content, "text/html")]
-            }
-
-            send_email_celery.delay([email_data])
+            send_invite_email.delay([self._build_invite_email(obj, invite)])
             messages.success(request, f"Приглашение отправлено на {obj.email}")
 
             self.log_action(
@@ -108,11 +197,12 @@ class UserAdmin(admin.ModelAdmin, AuditLogMixin):
             )
 
 @admin.register(AuditLog)
-class AuditLogAdmin(admin.ModelAdmin):
+class AuditLogAdmin(TrigramSearchMixin, admin.ModelAdmin):
     list_display = ("timestamp", "user_display", "module", "action_display")
     list_filter = ("module", "action", "timestamp")
     search_fields = ("user__email", "object_repr", "module")
     ordering = ("-timestamp",)
+    list_select_related = ("user",)
     readonly_fields = [f.name for f in AuditLog._meta.fields]
     list_per_page = 25
 
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from django.contrib.auth.models import update_last_login
+        from django.contrib.auth.signals import user_logged_in
+
+        from . import signals  # noqa: F401
+
+        # Стандартный обработчик Django пишет last_login на каждый вход в админку,
+        # вместо него last_login обновляется через login_audit с коалесценцией.
+        # Отключается здесь, а не при импорте signals: admin.autodiscover()
+        # импортирует signals раньше, чем AuthConfig.ready() его подключит.
+        user_logged_in.disconnect(update_last_login, dispatch_uid="update_last_login")
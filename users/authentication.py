@@ -2,8 +2,12 @@ from rest_framework import permissions
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import BasePermission
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework.exceptions import AuthenticationFailed
 
+from .revocation import get_revocation_list
+
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
@@ -11,6 +15,14 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
 
 
 class CustomJWTAuthentication(JWTAuthentication):
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+
+        if get_revocation_list().is_revoked(validated_token.get(api_settings.JTI_CLAIM)):
+            raise InvalidToken('Токен отозван')
+
+        return validated_token
+
     def get_user(self, validated_token):
         user = super().get_user(validated_token)
 
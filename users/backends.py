@@ -0,0 +1,135 @@
+import copy
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PERMISSIONS_VERSION_KEY = "users:perms:version"
+PERMISSIONS_CACHE_KEY = "users:perms:{user_id}"
+USER_GENERATION_KEY = "users:session_user:{user_id}:gen"
+
+
+def bump_permissions_version():
+    """
+    Сброс кэша прав всех пользователей (изменились группы или права групп).
+
+    Версия — случайное значение, а не счётчик: после вытеснения ключа
+    счётчик начался бы заново и совпал бы со старыми записями.
+    """
+    cache.set(PERMISSIONS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def _get_permissions_version(cached):
+    version = cached.get(PERMISSIONS_VERSION_KEY)
+    if version is None:
+        # Ключа нет (ещё не создан или вытеснен) — новая версия, старые записи не подойдут
+        version = uuid.uuid4().hex
+        if not cache.add(PERMISSIONS_VERSION_KEY, version, timeout=None):
+            version = cache.get(PERMISSIONS_VERSION_KEY, version)
+    return version
+
+
+def forget_permissions(user_ids):
+    cache.delete_many([PERMISSIONS_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend с небольшим кэшем пользователей в памяти процесса
+    и кэшем прав в Django cache.
+
+    AuthenticationMiddleware на каждый запрос с сессией вызывает get_user(),
+    то есть делает SELECT в users_user. Здесь пользователь берётся из кэша
+    на SESSION_USER_CACHE_TTL секунд. Запись в памяти хранит поколение
+    пользователя из общего кэша; при сохранении/удалении пользователя
+    и массовых изменениях поколение меняется (см. users.signals), поэтому
+    запись устаревает во всех процессах. Проверка — один GET в кэш вместо
+    SELECT; если кэш недоступен, пользователь читается из БД.
+
+    Права (has_perm, get_all_permissions) Django кэширует только на объекте
+    пользователя в рамках запроса. Здесь набор прав хранится в кэше под
+    ключом пользователя вместе с версией прав; версия меняется при
+    изменении групп и прав, и все записи со старой версией игнорируются.
+    """
+
+    _cache = {}
+    _lock = threading.Lock()
+
+    def get_user(self, user_id):
+        ttl = settings.SESSION_USER_CACHE_TTL
+        if not ttl:
+            return super().get_user(user_id)
+
+        key = str(user_id)
+        try:
+            # Поколение читается до SELECT: изменение после него сбросит запись
+            generation = cache.get(USER_GENERATION_KEY.format(user_id=key))
+        except Exception as error:
+            logger.warning(f"Кэш недоступен, пользователь читается из БД: {error}")
+            return super().get_user(user_id)
+
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic() and entry[1] == generation:
+            # Копия, чтобы атрибуты запроса (_perm_cache, backend) не попадали в кэш
+            return copy.copy(entry[2])
+
+        user = super().get_user(user_id)
+        if user is not None:
+            with self._lock:
+                if len(self._cache) >= settings.SESSION_USER_CACHE_SIZE:
+                    self._cache.clear()
+                self._cache[key] = (time.monotonic() + ttl, generation, copy.copy(user))
+        return user
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        if not hasattr(user_obj, "_perm_cache"):
+            user_key = PERMISSIONS_CACHE_KEY.format(user_id=user_obj.pk)
+            try:
+                cached = cache.get_many([PERMISSIONS_VERSION_KEY, user_key])
+                version = _get_permissions_version(cached)
+            except Exception as error:
+                # Кэш недоступен — права считаются из БД, как в ModelBackend
+                logger.warning(f"Кэш прав недоступен: {error}")
+                return super().get_all_permissions(user_obj, obj)
+
+            if user_key in cached and cached[user_key][0] == version:
+                user_obj._perm_cache = cached[user_key][1]
+            else:
+                perms = super().get_all_permissions(user_obj, obj)
+                try:
+                    cache.set(user_key, (version, perms), timeout=settings.PERMISSION_CACHE_TIMEOUT)
+                except Exception as error:
+                    logger.warning(f"Не удалось сохранить права в кэш: {error}")
+
+        return user_obj._perm_cache
+
+    @classmethod
+    def invalidate(cls, user_ids):
+        with cls._lock:
+            for user_id in user_ids:
+                cls._cache.pop(str(user_id), None)
+
+        ttl = settings.SESSION_USER_CACHE_TTL
+        if not ttl:
+            return
+        # Поколение живёт дольше записей в памяти, созданных до смены,
+        # иначе после истечения ключа они снова совпадут с пустым поколением
+        generation = uuid.uuid4().hex
+        try:
+            cache.set_many(
+                {USER_GENERATION_KEY.format(user_id=user_id): generation for user_id in user_ids},
+                timeout=ttl + 1,
+            )
+        except Exception as error:
+            logger.warning(f"Не удалось сбросить кэш пользователей в других процессах: {error}")
+
+__all__ = ()
@@ -0,0 +1,108 @@
+import statistics
+import time
+
+
+def measure(func, repeat=10, warmup=1):
+    """
+    Замер времени выполнения func: repeat прогонов после warmup разогревочных.
+    Возвращает словарь со статистикой в миллисекундах и пропускной способностью.
+    """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    return {
+        "runs": repeat,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": percentile(timings, 50),
+        "p99_ms": percentile(timings, 99),
+        "ops_per_sec": 1000 * repeat / sum(timings) if sum(timings) else float("inf"),
+    }
+
+
+def percentile(sorted_values, percent):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def format_result(name, result):
+    return (
+        f"{name:<40} p50={result['p50_ms']:9.3f} ms  p99={result['p99_ms']:9.3f} ms  "
+        f"{result['ops_per_sec']:10.1f} ops/s"
+    )
+
+class InMemoryRedis:
+    """
+    Минимальная in-memory замена redis.Redis (команды, которые использует
+    users.revocation) для тестов и офлайн-бенчмарков.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.sorted_sets = {}
+        self.calls = []
+
+    def _alive(self, key):
+        value = self.values.get(key)
+        if value is None:
+            return False
+        if value[1] is not None and value[1] <= time.time():
+            del self.values[key]
+            return False
+        return True
+
+    def pipeline(self):
+        return InMemoryPipeline(self)
+
+    def set(self, key, value, ex=None):
+        self.calls.append(("set", key))
+        self.values[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    def exists(self, key):
+        self.calls.append(("exists", key))
+        return int(self._alive(key))
+
+    def zadd(self, name, mapping):
+        self.calls.append(("zadd", name))
+        self.sorted_sets.setdefault(name, {}).update(mapping)
+        return len(mapping)
+
+    def zremrangebyscore(self, name, min_score, max_score):
+        self.calls.append(("zremrangebyscore", name))
+        members = self.sorted_sets.get(name, {})
+        low = float(min_score)
+        removed = [member for member, score in members.items() if low <= score <= max_score]
+        for member in removed:
+            del members[member]
+        return len(removed)
+
+    def zrange(self, name, start, end):
+        self.calls.append(("zrange", name))
+        members = sorted(self.sorted_sets.get(name, {}).items(), key=lambda item: item[1])
+        return [member.encode() for member, _ in members]
+
+
+class InMemoryPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return command
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+__all__ = ()
@@ -0,0 +1,89 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import User, UserCounter
+
+COUNTER_FIELDS = ("role", "is_active", "is_archived")
+
+
+def counter_key(role, is_active, is_archived):
+    return role or "", bool(is_active), bool(is_archived)
+
+
+def instance_counter_key(user):
+    """Ключ счётчика по загруженным полям или None, если какое-то поле отложено (.only/.defer)."""
+    if any(field not in user.__dict__ for field in COUNTER_FIELDS):
+        return None
+    return counter_key(user.role, user.is_active, user.is_archived)
+
+
+def apply_deltas(deltas):
+    """Применение изменений {ключ: дельта}: один UPDATE ... SET count = count + N на ключ."""
+    for (role, is_active, is_archived), delta in deltas.items():
+        if not delta:
+            continue
+        lookup = {"role": role, "is_active": is_active, "is_archived": is_archived}
+        if not UserCounter.objects.filter(**lookup).update(count=F("count") + delta):
+            UserCounter.objects.get_or_create(**lookup)
+            UserCounter.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def record_bulk_update(users, fields):
+    """
+    Учёт массового QuerySet.update() по пользователям, загруженным до изменения
+    (с полями role/is_active/is_archived).
+    """
+    deltas = Counter()
+    for user in users:
+        old_key = instance_counter_key(user)
+        if old_key is None:
+            continue
+        new_values = {**dict(zip(COUNTER_FIELDS, old_key)), **fields}
+        deltas[old_key] -= 1
+        deltas[counter_key(**new_values)] += 1
+    apply_deltas(deltas)
+
+
+def get_user_stats():
+    """Статистика по ролям и статусам из таблицы счётчиков (не зависит от числа пользователей)."""
+    stats = {
+        "total": 0,
+        "active": 0,
+        "inactive": 0,
+        "archived": 0,
+        "by_role": {},
+    }
+    for counter in UserCounter.objects.filter(count__gt=0):
+        role_stats = stats["by_role"].setdefault(
+            counter.role or None, {"total": 0, "active": 0, "inactive": 0, "archived": 0}
+        )
+        for bucket in (stats, role_stats):
+            bucket["total"] += counter.count
+            if counter.is_archived:
+                bucket["archived"] += counter.count
+            elif counter.is_active:
+                bucket["active"] += counter.count
+            else:
+                bucket["inactive"] += counter.count
+    return stats
+
+
+@transaction.atomic
+def rebuild_counters():
+    """Пересборка счётчиков с нуля по users_user."""
+    UserCounter.objects.all().delete()
+    rows = User.objects.order_by().values(*COUNTER_FIELDS).annotate(count=Count("id"))
+    deltas = Counter()
+    for row in rows:
+        deltas[counter_key(row["role"], row["is_active"], row["is_archived"])] += row["count"]
+    UserCounter.objects.bulk_create(
+        [
+            UserCounter(role=role, is_active=is_active, is_archived=is_archived, count=count)
+            for (role, is_active, is_archived), count in deltas.items()
+        ]
+    )
+    return sum(deltas.values())
+
+__all__ = ()
@@ -0,0 +1,25 @@
+import time
+
+from django.core.cache import cache
+
+DIRECTORY_VERSION_KEY = "users:directory:version"
+
+
+def get_directory_version():
+    """
+    Метка последнего изменения пользователей (unix time) для ETag и
+    Last-Modified справочника: один запрос к кэшу вместо агрегата по users_user.
+    Если ключа нет (кэш очищен), считается, что всё изменилось сейчас.
+    """
+    version = cache.get(DIRECTORY_VERSION_KEY)
+    if version is None:
+        version = time.time()
+        if not cache.add(DIRECTORY_VERSION_KEY, version, timeout=None):
+            version = cache.get(DIRECTORY_VERSION_KEY, version)
+    return version
+
+
+def bump_directory_version():
+    cache.set(DIRECTORY_VERSION_KEY, time.time(), timeout=None)
+
+__all__ = ()
@@ -1,6 +1,6 @@
 from django.core.mail.backends.base import BaseEmailBackend
 from django.core.mail.message import EmailMultiAlternatives
-from .tasks import send_email_celery
+from .tasks import send_transactional_email
 
 
 class CeleryEmail(BaseEmailBackend):
@@ -25,6 +25,6 @@ class CeleryEmail(BaseEmailBackend):
                 "headers": message.extra_headers,
             }
             emails.append(data)
-        send_email_celery.delay(emails)
+        send_transactional_email.delay(emails)
 
 __all__ = ()
@@ -0,0 +1,104 @@
+import functools
+import hashlib
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_CACHE_KEY = "idempotency:{scope}:{key}"
+MAX_KEY_LENGTH = 255
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _replay(stored):
+    response = Response(stored["data"], status=stored["status"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(handler):
+    """
+    Поддержка заголовка Idempotency-Key для метода APIView.
+
+    Первый ответ (кроме 5xx) сохраняется в кэше на IDEMPOTENCY_KEY_TTL секунд,
+    повтор с тем же ключом получает его без выполнения обработчика (без БД и
+    Celery). Параллельные дубли ждут окончания первого запроса под коротким
+    замком (cache.add). Тот же ключ с другим телом запроса — 422.
+    Ключи разделены по пользователю, отправившему запрос.
+    """
+
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return handler(view, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"{IDEMPOTENCY_HEADER} длиннее {MAX_KEY_LENGTH} символов"}, status=400)
+
+        scope = request.user.pk if request.user and request.user.is_authenticated else "anonymous"
+        cache_key = IDEMPOTENCY_CACHE_KEY.format(scope=scope, key=hashlib.sha256(key.encode()).hexdigest())
+        lock_key = f"{cache_key}:lock"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        token = None
+        if stored is None:
+            token = uuid.uuid4().hex
+            if cache.add(lock_key, token, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                # Первый запрос мог сохранить ответ и снять замок между get() и add()
+                stored = cache.get(cache_key)
+            else:
+                token = None
+                stored = _wait_for_response(cache_key, lock_key)
+                if stored is None:
+                    response = Response({"error": "Запрос с этим Idempotency-Key ещё выполняется"}, status=409)
+                    response["Retry-After"] = "1"
+                    return response
+
+        try:
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    return Response({"error": f"{IDEMPOTENCY_HEADER} уже использован с другим запросом"}, status=422)
+                return _replay(stored)
+
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code < 500:
+                cache.set(cache_key, {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": response.data,
+                }, timeout=settings.IDEMPOTENCY_KEY_TTL)
+            return response
+        finally:
+            if token is not None:
+                _release_lock(lock_key, token)
+
+    return wrapper
+
+
+def _release_lock(lock_key, token):
+    """Снятие замка, только если он ещё наш: после истечения его мог взять другой запрос."""
+    if cache.get(lock_key) == token:
+        cache.delete(lock_key)
+
+
+def _wait_for_response(cache_key, lock_key):
+    """Ожидание ответа параллельного запроса с тем же ключом, не дольше времени жизни замка."""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        values = cache.get_many([cache_key, lock_key])
+        if cache_key in values or lock_key not in values:
+            return values.get(cache_key)
+    return None
+
+__all__ = ()
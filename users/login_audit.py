@@ -0,0 +1,124 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import User, AuditLog
+from .tasks import flush_login_audit
+
+logger = logging.getLogger(__name__)
+
+LAST_LOGIN_CACHE_KEY = "users:last_login:{user_id}"
+
+_buffer = []
+_buffer_lock = threading.Lock()
+_buffer_started_at = None
+_flush_timer = None
+
+
+def touch_last_login(user_id):
+    """
+    Обновление last_login не чаще одного раза в LAST_LOGIN_UPDATE_INTERVAL минут.
+    Маркер в кэше ставится через add(), поэтому из параллельных логинов
+    UPDATE выполнит только один.
+    """
+    timeout = settings.LAST_LOGIN_UPDATE_INTERVAL * 60
+    if not cache.add(LAST_LOGIN_CACHE_KEY.format(user_id=user_id), 1, timeout=timeout):
+        return False
+
+    User.objects.filter(pk=user_id).update(last_login=timezone.now())
+    return True
+
+
+def forget_last_login(user_ids):
+    """Сброс маркеров last_login, чтобы следующий вход записался сразу."""
+    cache.delete_many([LAST_LOGIN_CACHE_KEY.format(user_id=user_id) for user_id in user_ids])
+
+
+def get_client_ip(request):
+    """IP клиента по тем же правилам, что и у лимитов DRF (NUM_PROXIES)."""
+    if request is None:
+        return None
+    # DRF импортируется здесь: модуль грузится и в Celery-воркере (через users.signals)
+    from rest_framework.throttling import BaseThrottle
+
+    return BaseThrottle().get_ident(request)
+
+
+def record_login(user_id, object_repr, method, request=None):
+    """Вход пользователя: last_login (с коалесценцией) + строка аудита в буфер."""
+    touch_last_login(user_id)
+    _record(user_id, object_repr, AuditLog.ACTION_LOGIN, method, request)
+
+
+def record_token_refresh(user_id, method, request=None):
+    """
+    Обновление JWT: отдельное действие, а не вход. Представление пользователя
+    подставляется при записи пачки (users.tasks.flush_login_audit), чтобы не
+    загружать пользователя на каждый refresh.
+    """
+    touch_last_login(user_id)
+    _record(user_id, None, AuditLog.ACTION_TOKEN_REFRESH, method, request)
+
+
+def record_logout(user_id, object_repr, method, request=None):
+    _record(user_id, object_repr, AuditLog.ACTION_LOGOUT, method, request)
+
+
+def _record(user_id, object_repr, action, method, request):
+    if not settings.LOGIN_AUDIT_ENABLED:
+        return
+
+    event = {
+        "user_id": str(user_id),
+        "action": action,
+        "object_repr": object_repr,
+        "changes": {
+            "method": method,
+            "ip": get_client_ip(request),
+            "at": timezone.now().isoformat(),
+        },
+    }
+
+    global _buffer_started_at, _flush_timer
+    with _buffer_lock:
+        if not _buffer:
+            _buffer_started_at = time.monotonic()
+            # Без таймера одиночное событие ждало бы следующего входа в этом процессе
+            _flush_timer = threading.Timer(settings.LOGIN_AUDIT_FLUSH_INTERVAL, flush)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+        _buffer.append(event)
+        is_full = len(_buffer) >= settings.LOGIN_AUDIT_BATCH_SIZE
+        is_stale = time.monotonic() - _buffer_started_at >= settings.LOGIN_AUDIT_FLUSH_INTERVAL
+
+    if is_full or is_stale:
+        flush()
+
+
+def flush():
+    """Отправка накопленных событий одной фоновой задачей (один bulk INSERT)."""
+    global _buffer, _flush_timer
+    with _buffer_lock:
+        events, _buffer = _buffer, []
+        timer, _flush_timer = _flush_timer, None
+
+    if timer is not None:
+        timer.cancel()
+
+    if not events:
+        return
+
+    try:
+        flush_login_audit.delay(events)
+    except Exception as error:
+        logger.error(f"Не удалось отправить {len(events)} событий входа в аудит: {error}")
+
+
+atexit.register(flush)
+
+__all__ = ()
@@ -0,0 +1,58 @@
+from django.db import connection, transaction
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from users.backends import CachedModelBackend
+from users.benchmarks import format_result, measure
+from users.models import User
+
+ADMIN_PAGES = (
+    "/admin/",
+    "/admin/users/user/",
+    "/admin/users/auditlog/",
+)
+
+PROFILES = {
+    "db sessions": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "AUTHENTICATION_BACKENDS": ["django.contrib.auth.backends.ModelBackend"],
+    },
+    "cached_db + user cache": {
+        "SESSION_ENGINE": "users.sessions",
+        "AUTHENTICATION_BACKENDS": ["users.backends.CachedModelBackend"],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Бенчмарк страниц админки: запросы к БД и время с сессиями в БД и в кэше"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=["*"]):
+            admin_user = User.objects.create_superuser(
+                "bench-admin@example.com", "bench-password", name="Bench", role=User.Roles.ADMIN
+            )
+
+            for profile, profile_settings in PROFILES.items():
+                with override_settings(**profile_settings):
+                    CachedModelBackend.invalidate([admin_user.pk])
+                    client = Client()
+                    client.force_login(admin_user)
+
+                    for page in ADMIN_PAGES:
+                        response = client.get(page)  # прогрев кэшей
+                        if response.status_code != 200:
+                            raise CommandError(f"{page} вернул {response.status_code}")
+                        with CaptureQueriesContext(connection) as queries:
+                            client.get(page)
+                        query_count = len(queries)
+                        result = measure(lambda: client.get(page), repeat=options["repeat"])
+                        self.stdout.write(
+                            f"{format_result(f'{profile} {page}', result)}  queries={query_count}"
+                        )
+
+            transaction.set_rollback(True)
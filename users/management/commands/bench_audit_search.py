@@ -0,0 +1,94 @@
+import random
+import uuid
+
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from users.admin import AuditLogAdmin, UserAdmin
+from users.benchmarks import format_result, measure
+from users.models import AuditLog, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарк поиска в AuditLogAdmin/UserAdmin: стандартный поиск Django "
+        "против триграммного на синтетических данных. По умолчанию данные "
+        "откатываются после замера."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Количество строк аудита")
+        parser.add_argument("--users", type=int, default=10_000, help="Количество пользователей")
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--terms", nargs="+", default=["user4242", "users", "edit", "zzz-missing"])
+        parser.add_argument("--keep", action="store_true", help="Не откатывать синтетические данные")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._populate(options)
+            self._run(options)
+            if not options["keep"]:
+                transaction.set_rollback(True)
+
+    def _populate(self, options):
+        self.stdout.write(f"Создание {options['users']} пользователей и {options['rows']} строк аудита...")
+        users = User.objects.bulk_create(
+            [
+                User(email=f"user{i}@bench.example.com", name=f"Bench User {i}", role=User.Roles.MANAGER)
+                for i in range(options["users"])
+            ],
+            batch_size=options["batch_size"],
+        )
+
+        actions = [action for action, _ in AuditLog.ACTION_CHOICES]
+        modules = ["users", "auth", "orders", "reports"]
+        created = 0
+        while created < options["rows"]:
+            size = min(options["batch_size"], options["rows"] - created)
+            AuditLog.objects.bulk_create(
+                [
+                    AuditLog(
+                        id=uuid.uuid4(),
+                        user=random.choice(users),
+                        action=random.choice(actions),
+                        module=random.choice(modules),
+                        object_repr=f"user{random.randrange(options['users'])}@bench.example.com (Менеджер)",
+                        changes={},
+                    )
+                    for _ in range(size)
+                ],
+                batch_size=options["batch_size"],
+            )
+            created += size
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE users_user")
+                cursor.execute("ANALYZE users_auditlog")
+
+    def _run(self, options):
+        for model, admin_class in ((AuditLog, AuditLogAdmin), (User, UserAdmin)):
+            model_admin = admin_class(model, admin.site)
+            queryset = model._default_manager.all()
+
+            for term in options["terms"]:
+                default = measure(
+                    lambda: self._changelist_page(admin.ModelAdmin.get_search_results(model_admin, None, queryset, term)),
+                    repeat=options["repeat"],
+                )
+                trigram = measure(
+                    lambda: self._changelist_page(model_admin.get_search_results(None, queryset, term)),
+                    repeat=options["repeat"],
+                )
+                self.stdout.write(format_result(f"{model.__name__} default '{term}'", default))
+                self.stdout.write(format_result(f"{model.__name__} trigram '{term}'", trigram))
+
+    def _changelist_page(self, search_results):
+        # Как в changelist: COUNT(*) для пагинатора + первая страница
+        queryset, may_have_duplicates = search_results
+        if may_have_duplicates:
+            queryset = queryset.distinct()
+        queryset.count()
+        list(queryset[:25])
@@ -0,0 +1,84 @@
+import io
+import secrets
+import tracemalloc
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from users.benchmarks import format_result, measure
+from users.models import User
+from users.parsers import FastJSONParser
+from users.renderers import FastJSONRenderer, orjson
+
+
+class Command(BaseCommand):
+    help = "Бенчмарк сериализации JSON: стандартные JSONRenderer/JSONParser DRF против orjson-версий"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000, help="Размер списка пользователей")
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson не установлен: Fast*-классы используют стандартный json"))
+
+        payloads = {
+            "user list": self._user_list(options["users"]),
+            "user list (JSON:API)": self._json_api_user_list(options["users"]),
+            "token pair": self._token_pair(),
+        }
+
+        for name, payload in payloads.items():
+            for label, renderer in (("stdlib", JSONRenderer()), ("orjson", FastJSONRenderer())):
+                result = measure(lambda: renderer.render(payload), repeat=options["repeat"])
+                peak = self._peak_allocation(lambda: renderer.render(payload))
+                self.stdout.write(f"{format_result(f'render {name} [{label}]', result)}  peak={peak / 1024:8.1f} KiB")
+
+            body = JSONRenderer().render(payload)
+            for label, parser in (("stdlib", JSONParser()), ("orjson", FastJSONParser())):
+                result = measure(lambda: parser.parse(io.BytesIO(body)), repeat=options["repeat"])
+                peak = self._peak_allocation(lambda: parser.parse(io.BytesIO(body)))
+                self.stdout.write(f"{format_result(f'parse {name} [{label}]', result)}  peak={peak / 1024:8.1f} KiB")
+
+    def _peak_allocation(self, func):
+        tracemalloc.start()
+        try:
+            func()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _user_list(self, count):
+        now = timezone.now().isoformat()
+        roles = [role for role, _ in User.Roles.choices]
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "email": f"user{i}@example.com",
+                "name": f"Пользователь {i}",
+                "role": roles[i % len(roles)],
+                "is_active": i % 3 != 0,
+                "is_archived": i % 10 == 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for i in range(count)
+        ]
+
+    def _json_api_user_list(self, count):
+        return {
+            "data": [
+                {"type": "User", "id": user.pop("id"), "attributes": user}
+                for user in self._user_list(count)
+            ],
+            "meta": {"pagination": {"count": count}},
+        }
+
+    def _token_pair(self):
+        return {
+            "refresh": secrets.token_urlsafe(180),
+            "access": secrets.token_urlsafe(180),
+        }
@@ -0,0 +1,71 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+SETUP_CODE = "import django; django.setup()"
+URLCONF_CODE = "; from django.urls import get_resolver; get_resolver().url_patterns"
+
+
+class Command(BaseCommand):
+    help = (
+        "Профиль холодного старта: время django.setup() в отдельном процессе "
+        "и разбивка времени импорта по модулям (python -X importtime). "
+        "Профиль настроек выбирается стандартным --settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Сколько модулей показать")
+        parser.add_argument("--repeat", type=int, default=3, help="Количество замеров холодного старта")
+        parser.add_argument("--urls", action="store_true", help="Загружать также URLconf (как веб-процесс)")
+
+    def handle(self, *args, **options):
+        code = SETUP_CODE + (URLCONF_CODE if options["urls"] else "")
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ["DJANGO_SETTINGS_MODULE"]}
+        self.stdout.write(f"Настройки: {env['DJANGO_SETTINGS_MODULE']}")
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            self._run([sys.executable, "-c", code], env)
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f"Холодный старт: median={statistics.median(timings):.1f} ms "
+            f"min={min(timings):.1f} ms max={max(timings):.1f} ms"
+        )
+
+        stderr = self._run([sys.executable, "-X", "importtime", "-c", code], env)
+        modules = self._parse_importtime(stderr)
+
+        self.stdout.write(f"\nТоп-{options['top']} модулей по суммарному времени импорта (ms):")
+        for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][1])[:options["top"]]:
+            self.stdout.write(f"{cumulative / 1000:10.1f} {own / 1000:10.1f}  {name}")
+
+        packages = defaultdict(int)
+        for name, (own, _) in modules.items():
+            packages[name.split(".")[0]] += own
+        self.stdout.write(f"\nТоп-{options['top']} пакетов по собственному времени импорта (ms):")
+        for name, own in sorted(packages.items(), key=lambda item: -item[1])[:options["top"]]:
+            self.stdout.write(f"{own / 1000:10.1f}  {name}")
+
+        self.stdout.write(f"\nВсего модулей: {len(modules)}, пакетов: {len(packages)}")
+
+    def _run(self, command, env):
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(result.stderr[-2000:])
+        return result.stderr
+
+    def _parse_importtime(self, stderr):
+        # Формат строк: "import time:       self [us] |  cumulative | imported package"
+        modules = {}
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split("|", 2)
+            modules[name.strip()] = (int(own), int(cumulative))
+        return modules
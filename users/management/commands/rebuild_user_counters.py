@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from users.counters import get_user_stats, rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Пересборка счётчиков пользователей по ролям и статусам с нуля"
+
+    def handle(self, *args, **options):
+        before = get_user_stats()["total"]
+        total = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Счётчики пересобраны: пользователей {total} (было в счётчиках {before})"))
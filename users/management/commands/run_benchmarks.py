@@ -0,0 +1,203 @@
+import itertools
+import json
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users import revocation
+from users.benchmarks import InMemoryRedis, format_result, measure
+from users.counters import rebuild_counters
+from users.models import AuditLog, User, UserInvite
+from users.utils import chunked
+
+BENCH_PASSWORD = "Bench-Str0ng-pass!"
+SEED_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Бенчмарки приглашений, JWT и админки на отдельной тестовой БД: p50/p99, "
+        "пропускная способность, число запросов, сравнение с сохранённым baseline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=30)
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[10_000],
+            help="Объёмы users_user и users_auditlog для замеров админки, например --rows 10000 1000000"
+        )
+        parser.add_argument("--baseline", help="JSON с baseline для сравнения")
+        parser.add_argument("--save-baseline", help="Куда сохранить результаты как новый baseline")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Допустимый рост p50 относительно baseline (0.2 = 20%%)"
+        )
+
+    def handle(self, *args, **options):
+        if not settings.TOKEN_REVOCATION_REDIS_URL:
+            revocation._revocation_list = revocation.TokenRevocationList(client=InMemoryRedis())
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(ALLOWED_HOSTS=["*"]):
+                results = self._run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w", encoding="utf-8") as file:
+                json.dump({"scenarios": results}, file, ensure_ascii=False, indent=2)
+            self.stdout.write(f"Baseline сохранён в {options['save_baseline']}")
+
+        if options["baseline"]:
+            self._compare(results, options["baseline"], options["threshold"])
+
+    def _run(self, options):
+        repeat = options["repeat"]
+        results = {}
+        self.admin = User.objects.create_superuser(
+            "bench-admin@example.com", BENCH_PASSWORD, name="Bench", role=User.Roles.ADMIN
+        )
+
+        for level, rows in enumerate(sorted(options["rows"])):
+            self._seed(rows)
+            if level == 0:
+                for name, func in self._flow_scenarios(repeat):
+                    results[name] = self._measure(name, func, repeat)
+            for name, func in self._admin_scenarios():
+                results[f"{name} @{rows}"] = self._measure(f"{name} @{rows}", func, repeat)
+
+        return results
+
+    def _measure(self, name, func, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        query_count = len(queries)
+
+        result = measure(func, repeat=repeat)
+        result["queries"] = query_count
+        self.stdout.write(f"{format_result(name, result)}  queries={query_count}")
+        return result
+
+    def _flow_scenarios(self, repeat):
+        refresh = RefreshToken.for_user(self.admin)
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        anonymous = APIClient()
+        client = Client()
+
+        invite_numbers = itertools.count()
+        # Запуск для подсчёта запросов + разогрев + repeat: каждому POST нужно своё приглашение
+        confirm_tokens = iter(self._pending_invites(repeat + 2))
+        get_token = self._pending_invites(1)[0]
+
+        yield "SendInviteView POST", lambda: self._check(api.post("/users/invite/send/", {
+            "email": f"invite{next(invite_numbers)}@example.com",
+            "name": "Bench",
+            "role": User.Roles.MANAGER,
+        }, format="json"), 201)
+        yield "ConfirmInvitePage GET", lambda: self._check(
+            client.get(f"/users/invite/confirm_page/{get_token}/"), 200
+        )
+        yield "ConfirmInvitePage POST", lambda: self._check(
+            client.post(f"/users/invite/confirm_page/{next(confirm_tokens)}/", {"password": BENCH_PASSWORD}), 302
+        )
+        yield "JWT create", lambda: self._check(anonymous.post("/users/auth/jwt/create/", {
+            "email": self.admin.email,
+            "password": BENCH_PASSWORD,
+        }, format="json"), 200)
+        yield "JWT refresh", lambda: self._check(
+            anonymous.post("/users/auth/jwt/refresh/", {"refresh": str(refresh)}, format="json"), 200
+        )
+        yield "JWT verify", lambda: self._check(
+            anonymous.post("/users/auth/jwt/verify/", {"token": str(refresh.access_token)}, format="json"), 200
+        )
+        yield "CustomJWTAuthentication GET stats", lambda: self._check(api.get("/users/stats/"), 200)
+
+    def _admin_scenarios(self):
+        client = Client()
+        client.force_login(self.admin)
+
+        yield "UserAdmin changelist", lambda: self._check(client.get("/admin/users/user/"), 200)
+        yield "AuditLogAdmin changelist", lambda: self._check(client.get("/admin/users/auditlog/"), 200)
+
+    def _pending_invites(self, count):
+        expires_at = timezone.now() + timezone.timedelta(days=3)
+        users = [
+            User.objects.create(email=f"pending-{uuid.uuid4().hex}@example.com", name="Pending",
+                                role=User.Roles.MANAGER, is_active=False)
+            for _ in range(count)
+        ]
+        invites = UserInvite.objects.bulk_create(
+            [UserInvite(user=user, invite_token=uuid.uuid4(), expires_at=expires_at) for user in users]
+        )
+        return [invite.invite_token for invite in invites]
+
+    def _seed(self, rows):
+        """Дозаполнение users_user и users_auditlog до rows строк (bulk_create пачками)."""
+        password = make_password(BENCH_PASSWORD)
+        roles = [value for value, _ in User.Roles.choices]
+
+        existing = User.objects.filter(email__startswith="seed").count()
+        for batch in chunked(range(existing, rows), SEED_BATCH_SIZE):
+            User.objects.bulk_create([
+                User(
+                    email=f"seed{i}@example.com",
+                    name=f"Seed {i}",
+                    role=roles[i % len(roles)],
+                    is_active=i % 3 != 0,
+                    is_archived=i % 10 == 0,
+                    password=password,
+                )
+                for i in batch
+            ])
+
+        existing = AuditLog.objects.filter(module="bench").count()
+        for batch in chunked(range(existing, rows), SEED_BATCH_SIZE):
+            AuditLog.objects.bulk_create([
+                AuditLog(
+                    user=self.admin,
+                    action=AuditLog.ACTION_LOGIN,
+                    module="bench",
+                    object_repr=f"seed{i}@example.com",
+                    changes={"seed": i},
+                )
+                for i in batch
+            ])
+
+        # bulk_create не вызывает сигналы, счётчики пересобираются целиком
+        rebuild_counters()
+
+    def _check(self, response, expected_status):
+        if response.status_code != expected_status:
+            raise CommandError(
+                f"{response.request['REQUEST_METHOD']} {response.request['PATH_INFO']} вернул "
+                f"{response.status_code}, ожидался {expected_status}"
+            )
+        return response
+
+    def _compare(self, results, baseline_path, threshold):
+        with open(baseline_path, encoding="utf-8") as file:
+            baseline = json.load(file)["scenarios"]
+
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result["p50_ms"] > base["p50_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p50 {base['p50_ms']:.3f} → {result['p50_ms']:.3f} ms")
+            if result["queries"] > base["queries"]:
+                regressions.append(f"{name}: запросов {base['queries']} → {result['queries']}")
+
+        if regressions:
+            raise CommandError("Регрессия относительно baseline:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS(f"Регрессий относительно {baseline_path} нет (порог {threshold:.0%})"))
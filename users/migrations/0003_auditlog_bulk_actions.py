@@ -0,0 +1,22 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_auditlog_options_auditlog_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='auditlog',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Аудит логов', 'verbose_name_plural': 'Мониторинг логов'},
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('create_invite', 'Создание приглашения'), ('confirmed_invite', 'Подтверждение приглашения'), ('edit_user', 'Редактирование пользователя'), ('delete_user', 'Удаление пользователя'), ('login', 'Вход в систему'), ('logout', 'Выход из системы'), ('archive_user', 'Архивация пользователя'), ('unarchive_user', 'Возврат из архива'), ('deactivate_user', 'Деактивация пользователя'), ('resend_invite', 'Повторная отправка приглашения')], max_length=50, verbose_name='Действие'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:25
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_user_counters(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    UserCounter = apps.get_model("users", "UserCounter")
+    counts = {}
+    rows = User.objects.order_by().values("role", "is_active", "is_archived").annotate(count=Count("id"))
+    for row in rows:
+        key = (row["role"] or "", row["is_active"], row["is_archived"])
+        counts[key] = counts.get(key, 0) + row["count"]
+    UserCounter.objects.bulk_create([
+        UserCounter(role=role, is_active=is_active, is_archived=is_archived, count=count)
+        for (role, is_active, is_archived), count in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_user_created_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, default='', max_length=20, verbose_name='Роль')),
+                ('is_active', models.BooleanField(verbose_name='Активен')),
+                ('is_archived', models.BooleanField(verbose_name='Архивный')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'Счётчик пользователей',
+                'verbose_name_plural': 'Счётчики пользователей',
+                'constraints': [models.UniqueConstraint(fields=('role', 'is_active', 'is_archived'), name='users_usercounter_unique_key')],
+            },
+        ),
+        migrations.RunPython(fill_user_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 13:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_usercounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(choices=[('create_invite', 'Создание приглашения'), ('confirmed_invite', 'Подтверждение приглашения'), ('edit_user', 'Редактирование пользователя'), ('delete_user', 'Удаление пользователя'), ('login', 'Вход в систему'), ('logout', 'Выход из системы'), ('token_refresh', 'Обновление токена'), ('archive_user', 'Архивация пользователя'), ('unarchive_user', 'Возврат из архива'), ('deactivate_user', 'Деактивация пользователя'), ('resend_invite', 'Повторная отправка приглашения')], max_length=50, verbose_name='Действие'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Дата создания'),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Время'),
+        ),
+    ]
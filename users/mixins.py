@@ -9,4 +9,18 @@ class AuditLogMixin:
             module=module,
             object_repr=str(obj),
             changes=changes or {}
-        )
\ No newline at end of file
+        )
+
+    def log_actions_bulk(self, user, action, module, objs, changes=None):
+        """Одна запись аудита на каждый объект, все строки одним bulk_create."""
+        from .models import AuditLog
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                user=user,
+                action=action,
+                module=module,
+                object_repr=str(obj),
+                changes=changes or {}
+            )
+            for obj in objs
+        ])
@@ -101,6 +101,10 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = _("Пользователь")
         verbose_name_plural = _("Пользователи")
         ordering = ["-created_at"]
+        indexes = [
+            # Курсорная пагинация справочника по (created_at, id)
+            models.Index(fields=["-created_at", "-id"], name="users_user_created_id_idx"),
+        ]
 
 
 
@@ -128,6 +132,11 @@ class AuditLog(models.Model):
     ACTION_DELETE_USER = "delete_user"
     ACTION_LOGIN = "login"
     ACTION_LOGOUT = "logout"
+    ACTION_TOKEN_REFRESH = "token_refresh"
+    ACTION_ARCHIVE_USER = "archive_user"
+    ACTION_UNARCHIVE_USER = "unarchive_user"
+    ACTION_DEACTIVATE_USER = "deactivate_user"
+    ACTION_RESEND_INVITE = "resend_invite"
 
     ACTION_CHOICES = [
         (ACTION_CREATE_INVITE, "Создание приглашения"),
@@ -136,10 +145,17 @@ class AuditLog(models.Model):
         (ACTION_DELETE_USER, "Удаление пользователя"),
         (ACTION_LOGIN, "Вход в систему"),
         (ACTION_LOGOUT, "Выход из системы"),
+        (ACTION_TOKEN_REFRESH, "Обновление токена"),
+        (ACTION_ARCHIVE_USER, "Архивация пользователя"),
+        (ACTION_UNARCHIVE_USER, "Возврат из архива"),
+        (ACTION_DEACTIVATE_USER, "Деактивация пользователя"),
+        (ACTION_RESEND_INVITE, "Повторная отправка приглашения"),
     ]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    timestamp = models.DateTimeField(auto_now_add=True, verbose_name="Время")
+    # default вместо auto_now_add: события входа пишутся пачками позже и
+    # сохраняют время самого события
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Время")
     user = models.ForeignKey(User, null=True, on_delete=models.SET_NULL, verbose_name="Пользователь")
     action = models.CharField(max_length=50, choices=ACTION_CHOICES, verbose_name="Действие")
     module = models.CharField(max_length=50, verbose_name="Модуль")
@@ -147,7 +163,7 @@ class AuditLog(models.Model):
     changes = models.JSONField(blank=True, null=True, verbose_name="Изменения")
 
     created_at = models.DateTimeField(
-        auto_now_add=True, verbose_name=_("Дата создания")
+        default=timezone.now, editable=False, verbose_name=_("Дата создания")
     )
     updated_at = models.DateTimeField(
         auto_now=True, verbose_name=_("Дата обновления")
@@ -162,4 +178,28 @@ class AuditLog(models.Model):
     class Meta:
         verbose_name = _("Аудит логов")
         verbose_name_plural = _("Мониторинг логов")
-        ordering = ["-created_at"]
\ No newline at end of file
+        ordering = ["-created_at"]
+
+class UserCounter(models.Model):
+    """
+    Количество пользователей по роли и статусу.
+
+    Поддерживается инкрементально (users.counters), чтобы статистика по ролям
+    и статусам не требовала COUNT(*) ... GROUP BY по users_user.
+    Пересборка с нуля: manage.py rebuild_user_counters.
+    """
+
+    role = models.CharField(max_length=20, blank=True, default="", verbose_name=_("Роль"))
+    is_active = models.BooleanField(verbose_name=_("Активен"))
+    is_archived = models.BooleanField(verbose_name=_("Архивный"))
+    count = models.BigIntegerField(default=0, verbose_name=_("Количество"))
+
+    def __str__(self):
+        return f"{self.role or '—'} / active={self.is_active} / archived={self.is_archived}: {self.count}"
+
+    class Meta:
+        verbose_name = _("Счётчик пользователей")
+        verbose_name_plural = _("Счётчики пользователей")
+        constraints = [
+            models.UniqueConstraint(fields=["role", "is_active", "is_archived"], name="users_usercounter_unique_key"),
+        ]
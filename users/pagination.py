@@ -0,0 +1,90 @@
+import base64
+import binascii
+import datetime
+import uuid
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Курсорная пагинация по паре (created_at, id) в формате JSON:API.
+
+    Курсор хранит значения последней записи страницы, следующая страница
+    выбирается условием created_at < c OR (created_at = c AND id < i) —
+    без OFFSET, поэтому время ответа не растёт с номером страницы.
+    """
+
+    cursor_query_param = "page[cursor]"
+    page_size_query_param = "page[size]"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Неверный курсор"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by("-created_at", "-id")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            created_at, pk = cursor
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split("|", 1)
+            created_at = datetime.datetime.fromisoformat(created_at)
+            pk = uuid.UUID(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        # created_at хранится с часовым поясом, наивное значение — подделанный курсор
+        if created_at.tzinfo is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def encode_cursor(self, obj):
+        raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "results": data,
+                "meta": {"pagination": {"size": self.page_size}},
+                "links": {
+                    "first": self.get_first_link(),
+                    "next": self.get_next_link(),
+                },
+            }
+        )
+
+__all__ = ()
@@ -0,0 +1,32 @@
+import codecs
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+from rest_framework_json_api import parsers as json_api_parsers
+
+from .renderers import FastJSONAPIRenderer, FastJSONRenderer, orjson
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser на orjson, без orjson или для не-UTF-8 тела — стандартный парсер."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class FastJSONAPIParser(json_api_parsers.JSONParser, FastJSONParser):
+    renderer_class = FastJSONAPIRenderer
+
+__all__ = ()
@@ -0,0 +1,58 @@
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_json_api import renderers as json_api_renderers
+
+try:
+    import orjson
+except ImportError:  # orjson не установлен — работаем через стандартный json
+    orjson = None
+
+
+_encoder = JSONEncoder()
+
+# orjson не экранирует U+2028/U+2029, а DRF экранирует их всегда
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+def _default(obj):
+    # Типы, которые orjson не знает (Decimal, ленивые строки, QuerySet, ...),
+    # а также datetime/date/time — сериализуем так же, как DRF.
+    return _encoder.default(obj)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer на orjson. Строки, даты, Decimal, UUID и ленивые строки
+    кодируются так же, как в DRF; отличия: float в экспоненциальной записи
+    (1e16 вместо 1e+16, то же число) и NaN/Infinity, которые orjson пишет как
+    null, а DRF отвергает. Если orjson не установлен, запрошен отступ,
+    отличный от 2 (browsable API), или orjson не может закодировать данные
+    (целые больше 64 бит), работает стандартный JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent not in (None, 2):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if _LINE_SEPARATOR in ret or _PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(_LINE_SEPARATOR, b'\\u2028').replace(_PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
+
+
+class FastJSONAPIRenderer(json_api_renderers.JSONRenderer, FastJSONRenderer):
+    """JSON:API-рендерер: структура документа от rest_framework_json_api, кодирование — orjson."""
+
+__all__ = ()
@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _redis():
+    # redis импортируется при первом обращении к Redis, а не при загрузке URLconf
+    import redis
+    return redis
+
+
+class RevocationUnavailable(Exception):
+    """Хранилище отозванных токенов недоступно, отзыв не записан."""
+
+
+class BloomFilter:
+    """Простой Bloom-фильтр на bytearray (двойное хеширование blake2b)."""
+
+    def __init__(self, size_bits, hash_count):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray((size_bits + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size_bits for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class TokenRevocationList:
+    """
+    Список отозванных JWT.
+
+    JTI хранятся в Redis с TTL, равным оставшемуся сроку жизни токена, плюс
+    индекс (sorted set по exp) для синхронизации. В процессе держится
+    Bloom-фильтр: промах по фильтру значит «не отозван» без похода в Redis,
+    попадание проверяется в Redis (фильтр допускает ложные срабатывания).
+    """
+
+    KEY_PREFIX = "revoked:jti:"
+    INDEX_KEY = "revoked:jti:index"
+    RETRY_INTERVAL = 1
+
+    def __init__(self, client=None, sync_interval=None, bloom_size=None, hash_count=None):
+        self._client = client
+        self.sync_interval = sync_interval if sync_interval is not None else settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        self.bloom_size = bloom_size or settings.TOKEN_REVOCATION_BLOOM_SIZE
+        self.hash_count = hash_count or settings.TOKEN_REVOCATION_BLOOM_HASHES
+        self.bloom = BloomFilter(self.bloom_size, self.hash_count)
+        self._last_sync = None
+        self._retry_at = 0
+        self._sync_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            timeout = settings.TOKEN_REVOCATION_SOCKET_TIMEOUT
+            self._client = _redis().Redis.from_url(
+                settings.TOKEN_REVOCATION_REDIS_URL, socket_connect_timeout=timeout, socket_timeout=timeout
+            )
+        return self._client
+
+    def revoke(self, jti, exp):
+        """Отзыв токена до момента exp (unix time)."""
+        ttl = int(exp - time.time())
+        if ttl <= 0:
+            return False
+
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self.KEY_PREFIX + jti, 1, ex=ttl)
+            pipe.zadd(self.INDEX_KEY, {jti: exp})
+            pipe.execute()
+        except _redis().RedisError as error:
+            logger.error(f"Не удалось отозвать токен {jti}: {error}")
+            raise RevocationUnavailable() from error
+
+        self.bloom.add(jti)
+        return True
+
+    def revoke_token(self, token):
+        return self.revoke(token[api_settings.JTI_CLAIM], token["exp"])
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+
+        # До первой успешной синхронизации фильтр пуст и ему нельзя верить
+        if self._maybe_sync() and jti not in self.bloom:
+            return False
+
+        try:
+            return bool(self.client.exists(self.KEY_PREFIX + jti))
+        except _redis().RedisError as error:
+            # Фильтр сказал «возможно отозван» (или ещё не загружен), а проверить нельзя — не пускаем.
+            logger.error(f"Не удалось проверить отзыв токена {jti}: {error}")
+            return True
+
+    def sync(self):
+        """Пересборка Bloom-фильтра по индексу отозванных токенов в Redis."""
+        try:
+            pipe = self.client.pipeline()
+            pipe.zremrangebyscore(self.INDEX_KEY, "-inf", time.time())
+            pipe.zrange(self.INDEX_KEY, 0, -1)
+            _, jtis = pipe.execute()
+        except _redis().RedisError as error:
+            logger.error(f"Не удалось синхронизировать список отозванных токенов: {error}")
+            return False
+
+        bloom = BloomFilter(self.bloom_size, self.hash_count)
+        for jti in jtis:
+            bloom.add(jti.decode() if isinstance(jti, bytes) else jti)
+        self.bloom = bloom
+        return True
+
+    def _maybe_sync(self):
+        """Синхронизация по расписанию; True, если фильтр хотя бы раз загружен из Redis."""
+        now = time.monotonic()
+        if self._last_sync is not None and now - self._last_sync < self.sync_interval:
+            return True
+        if now < self._retry_at:
+            return self._last_sync is not None
+        # Первую синхронизацию ждут все потоки, иначе пустой фильтр пропустит
+        # отозванные токены; дальше синхронизирует один поток, остальные
+        # работают со старым фильтром.
+        if not self._sync_lock.acquire(blocking=self._last_sync is None):
+            return True
+        try:
+            now = time.monotonic()
+            due = self._last_sync is None or now - self._last_sync >= self.sync_interval
+            if due and now >= self._retry_at:
+                if self.sync():
+                    self._last_sync = time.monotonic()
+                else:
+                    # Время синхронизации не сдвигается: повтор через RETRY_INTERVAL
+                    self._retry_at = time.monotonic() + self.RETRY_INTERVAL
+        finally:
+            self._sync_lock.release()
+        return self._last_sync is not None
+
+
+_revocation_list = None
+
+
+def get_revocation_list():
+    global _revocation_list
+    if _revocation_list is None:
+        _revocation_list = TokenRevocationList()
+    return _revocation_list
+
+__all__ = ()
@@ -0,0 +1,53 @@
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.db import connection
+from django.db.models import Q
+from django.utils.text import smart_split, unescape_string_literal
+
+
+class TrigramSearchMixin:
+    """
+    Поиск в админке, рассчитанный на GIN-индексы pg_trgm (см. миграцию
+    0004_trigram_search_indexes).
+
+    Django строит для search_fields условие UPPER(col::text) LIKE UPPER('%term%'),
+    которое на PostgreSQL попадает в триграммные индексы по UPPER(col::text).
+    Поля через связь (user__email) вместо JOIN превращаются в подзапрос
+    user_id IN (SELECT id ... WHERE UPPER(email::text) LIKE ...), чтобы поиск
+    по связанной таблице тоже шёл по индексу. На других СУБД (SQLite в тестах)
+    используется стандартный поиск Django.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        search_fields = self.get_search_fields(request)
+        if (
+            connection.vendor != "postgresql"
+            or not search_term
+            or not search_fields
+            or any(field[0] in "^=@" for field in search_fields)
+            or any(lookup_spawns_duplicates(self.opts, field) for field in search_fields)
+        ):
+            return super().get_search_results(request, queryset, search_term)
+
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")) and bit[0] == bit[-1]:
+                bit = unescape_string_literal(bit)
+
+            term_query = Q()
+            for field in search_fields:
+                term_query |= self._build_search_query(field, bit)
+            queryset = queryset.filter(term_query)
+
+        return queryset, False
+
+    def _build_search_query(self, field, term):
+        if "__" not in field:
+            return Q(**{f"{field}__icontains": term})
+
+        relation, remote_field = field.split("__", 1)
+        related_model = self.opts.get_field(relation).related_model
+        related_ids = related_model._default_manager.filter(
+            **{f"{remote_field}__icontains": term}
+        ).values("pk")
+        return Q(**{f"{relation}__in": related_ids})
+
+__all__ = ()
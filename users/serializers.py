@@ -1,7 +1,15 @@
 from djoser.serializers import TokenCreateSerializer
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_json_api import serializers as json_api_serializers
+from rest_framework_simplejwt.exceptions import TokenError
+
+from . import login_audit
+from .models import User
+from .revocation import get_revocation_list
 
 
 class ForbiddenUserCreateSerializer(serializers.Serializer):
@@ -21,4 +29,49 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         if getattr(user, 'is_archived', False):
             raise AuthenticationFailed('Аккаунт архивирован.', code='user_archived')
 
-        return data
\ No newline at end of file
+        login_audit.record_login(
+            user.pk, str(user), method="jwt_create", request=self.context.get("request")
+        )
+        return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        refresh = RefreshToken(attrs["refresh"])
+        if get_revocation_list().is_revoked(refresh.get(api_settings.JTI_CLAIM)):
+            raise AuthenticationFailed('Токен отозван.', code='token_revoked')
+
+        data = super().validate(attrs)
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id:
+            login_audit.record_token_refresh(user_id, method="jwt_refresh", request=self.context.get("request"))
+        return data
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(write_only=True)
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError as error:
+            raise serializers.ValidationError(str(error))
+
+
+class UserDirectorySerializer(json_api_serializers.ModelSerializer):
+    """Пользователь в справочнике; поддерживает sparse fieldsets (fields[users]=email,role)."""
+
+    class Meta:
+        model = User
+        resource_name = "users"
+        fields = (
+            "id",
+            "email",
+            "name",
+            "role",
+            "is_active",
+            "is_archived",
+            "created_at",
+            "updated_at",
+        )
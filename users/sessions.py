@@ -0,0 +1,97 @@
+import logging
+
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(cached_db.SessionStore):
+    """
+    cached_db, который переживает недоступность кэша сессий (Redis).
+
+    Стандартный cached_db при промахе кэша пишет сессию обратно в кэш без
+    обработки ошибок, а exists()/delete() обращаются к кэшу напрямую, так что
+    с упавшим Redis каждый запрос с сессией падает. Здесь ошибки кэша только
+    логируются, и сессия читается и пишется через django_session.
+    """
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception as error:
+            logger.warning(f"Кэш сессий недоступен, сессия читается из БД: {error}")
+            data = None
+
+        if data is not None:
+            return data
+
+        session = self._get_session_from_db()
+        if not session:
+            return {}
+        data = self.decode(session.session_data)
+        try:
+            self._cache.set(self.cache_key, data, self.get_expiry_age(expiry=session.expire_date))
+        except Exception as error:
+            logger.warning(f"Не удалось записать сессию в кэш: {error}")
+        return data
+
+    async def aload(self):
+        try:
+            data = await self._cache.aget(await self.acache_key())
+        except Exception as error:
+            logger.warning(f"Кэш сессий недоступен, сессия читается из БД: {error}")
+            data = None
+
+        if data is not None:
+            return data
+
+        session = await self._aget_session_from_db()
+        if not session:
+            return {}
+        data = self.decode(session.session_data)
+        try:
+            await self._cache.aset(
+                await self.acache_key(), data, await self.aget_expiry_age(expiry=session.expire_date)
+            )
+        except Exception as error:
+            logger.warning(f"Не удалось записать сессию в кэш: {error}")
+        return data
+
+    def exists(self, session_key):
+        try:
+            if session_key and (self.cache_key_prefix + session_key) in self._cache:
+                return True
+        except Exception as error:
+            logger.warning(f"Кэш сессий недоступен: {error}")
+        return DBStore.exists(self, session_key)
+
+    async def aexists(self, session_key):
+        try:
+            if session_key and await self._cache.ahas_key(self.cache_key_prefix + session_key):
+                return True
+        except Exception as error:
+            logger.warning(f"Кэш сессий недоступен: {error}")
+        return await DBStore.aexists(self, session_key)
+
+    def delete(self, session_key=None):
+        DBStore.delete(self, session_key)
+        session_key = session_key or self.session_key
+        if session_key is None:
+            return
+        try:
+            self._cache.delete(self.cache_key_prefix + session_key)
+        except Exception as error:
+            logger.warning(f"Не удалось удалить сессию из кэша: {error}")
+
+    async def adelete(self, session_key=None):
+        await DBStore.adelete(self, session_key)
+        session_key = session_key or self.session_key
+        if session_key is None:
+            return
+        try:
+            await self._cache.adelete(self.cache_key_prefix + session_key)
+        except Exception as error:
+            logger.warning(f"Не удалось удалить сессию из кэша: {error}")
+
+__all__ = ()
@@ -0,0 +1,106 @@
+from django.contrib.auth.models import Group, Permission
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import counters, login_audit
+from .directory import bump_directory_version
+from .backends import CachedModelBackend, bump_permissions_version, forget_permissions
+from .models import User
+
+
+# Массовое изменение пользователей через QuerySet.update(), в обход save()
+# и post_save. Аргументы: user_ids, fields (словарь новых значений).
+users_bulk_updated = Signal()
+
+
+@receiver(user_logged_in, dispatch_uid="users_record_session_login")
+def record_session_login(sender, request, user, **kwargs):
+    login_audit.record_login(user.pk, str(user), method="session", request=request)
+
+
+@receiver(user_logged_out, dispatch_uid="users_record_session_logout")
+def record_session_logout(sender, request, user, **kwargs):
+    if user is None:
+        return
+    login_audit.record_logout(user.pk, str(user), method="session", request=request)
+
+
+@receiver(users_bulk_updated, dispatch_uid="users_forget_last_login")
+def forget_last_login(sender, user_ids, fields, **kwargs):
+    login_audit.forget_last_login(user_ids)
+
+
+@receiver(users_bulk_updated, dispatch_uid="users_invalidate_cached_users")
+def invalidate_cached_users(sender, user_ids, fields, **kwargs):
+    CachedModelBackend.invalidate(user_ids)
+    forget_permissions(user_ids)
+    bump_directory_version()
+
+
+@receiver(post_save, sender=User, dispatch_uid="users_invalidate_cached_user_on_save")
+@receiver(post_delete, sender=User, dispatch_uid="users_invalidate_cached_user_on_delete")
+def invalidate_cached_user(sender, instance, **kwargs):
+    CachedModelBackend.invalidate([instance.pk])
+    forget_permissions([instance.pk])
+    bump_directory_version()
+
+
+@receiver(post_init, sender=User, dispatch_uid="users_counter_snapshot")
+def snapshot_counter_key(sender, instance, **kwargs):
+    # Состояние на момент загрузки, чтобы post_save знал, из какого счётчика вычитать
+    instance._counter_key = counters.instance_counter_key(instance)
+
+
+@receiver(pre_save, sender=User, dispatch_uid="users_counter_before_save")
+def load_counter_key_before_save(sender, instance, update_fields=None, **kwargs):
+    # Пользователь загружен с .only()/.defer() и снимка нет: старые значения читаются из БД
+    if instance._state.adding or instance._counter_key is not None:
+        return
+    if update_fields is not None and not set(update_fields) & set(counters.COUNTER_FIELDS):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(*counters.COUNTER_FIELDS).first()
+    if old is None:
+        return
+    instance._counter_key = counters.counter_key(*old)
+    # Отложенные поля в UPDATE не попадут, после сохранения в строке останутся старые значения
+    for field, value in zip(counters.COUNTER_FIELDS, old):
+        instance.__dict__.setdefault(field, value)
+
+
+@receiver(post_save, sender=User, dispatch_uid="users_counter_on_save")
+def update_counter_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(counters.COUNTER_FIELDS):
+        return
+    new_key = counters.instance_counter_key(instance)
+    old_key = None if created else instance._counter_key
+    if new_key is None or (not created and old_key is None) or old_key == new_key:
+        return
+    deltas = {new_key: 1}
+    if old_key is not None:
+        deltas[old_key] = -1
+    counters.apply_deltas(deltas)
+    instance._counter_key = new_key
+
+
+@receiver(post_delete, sender=User, dispatch_uid="users_counter_on_delete")
+def update_counter_on_delete(sender, instance, **kwargs):
+    key = instance._counter_key or counters.instance_counter_key(instance)
+    if key is not None:
+        counters.apply_deltas({key: -1})
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="users_perms_user_groups")
+@receiver(m2m_changed, sender=User.user_permissions.through, dispatch_uid="users_perms_user_permissions")
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid="users_perms_group_permissions")
+def invalidate_permissions_on_m2m_change(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_permissions_version()
+
+
+@receiver(post_save, sender=Group, dispatch_uid="users_perms_group_save")
+@receiver(post_delete, sender=Group, dispatch_uid="users_perms_group_delete")
+@receiver(post_save, sender=Permission, dispatch_uid="users_perms_permission_save")
+@receiver(post_delete, sender=Permission, dispatch_uid="users_perms_permission_delete")
+def invalidate_permissions_on_change(sender, **kwargs):
+    bump_permissions_version()
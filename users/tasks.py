@@ -1,17 +1,85 @@
 from celery import shared_task
+from django.conf import settings
+from django.contrib.sessions.models import Session
 from django.core.mail import get_connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.core.mail.message import EmailMultiAlternatives
 import logging
-import environ
+
+from .models import AuditLog, User
+
 logger = logging.getLogger(__name__)
 
-env = environ.Env()
-environ.Env.read_env()
+def _send_emails(emails):
+    con = get_connection(settings.TASK_EMAIL_BACKEND)
+    emails = [EmailMultiAlternatives(**i) for i in emails]
+    con.send_messages(emails)
+
 
 @shared_task()
 def send_email_celery(emails):
-    con = get_connection("django.core.mail.backends.smtp.EmailBackend")
-    emails = [EmailMultiAlternatives(**i) for i in emails]
-    con.send_messages(emails)
+    """Массовая почта (очередь bulk_mail), только для явных рассылок."""
+    _send_emails(emails)
+
+
+@shared_task()
+def send_transactional_email(emails):
+    """Почта через EMAIL_BACKEND: сброс пароля, активация, письма админам (очередь invites)."""
+    _send_emails(emails)
+
+
+@shared_task()
+def send_invite_email(emails):
+    """Письма-приглашения (очередь invites), не ждут очереди массовых рассылок."""
+    _send_emails(emails)
+
+
+@shared_task()
+def flush_login_audit(events):
+    """
+    Запись пачки событий входа/выхода одним bulk INSERT. Время записи берётся
+    из события, недостающие представления пользователей — одним запросом.
+    """
+    missing_ids = {event["user_id"] for event in events if event["object_repr"] is None}
+    user_reprs = {
+        str(user.pk): str(user) for user in User.objects.filter(pk__in=missing_ids).only("email", "role")
+    } if missing_ids else {}
+
+    rows = []
+    for event in events:
+        at = parse_datetime(event["changes"]["at"])
+        rows.append(AuditLog(
+            user_id=event["user_id"],
+            action=event["action"],
+            module="auth",
+            object_repr=event["object_repr"] or user_reprs.get(event["user_id"], event["user_id"]),
+            changes=event["changes"],
+            timestamp=at,
+            created_at=at,
+        ))
+    AuditLog.objects.bulk_create(rows, batch_size=500)
+
+
+@shared_task()
+def cleanup_expired_sessions():
+    """
+    Удаление истёкших сессий из django_session пачками по
+    SESSION_CLEANUP_BATCH_SIZE, не больше SESSION_CLEANUP_MAX_BATCHES за запуск,
+    чтобы не держать долгих блокировок.
+    """
+    now = timezone.now()
+    deleted = 0
+    for _ in range(settings.SESSION_CLEANUP_MAX_BATCHES):
+        keys = list(
+            Session.objects.filter(expire_date__lt=now)
+            .values_list("session_key", flat=True)[:settings.SESSION_CLEANUP_BATCH_SIZE]
+        )
+        if not keys:
+            break
+        deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+
+    logger.info(f"Удалено истёкших сессий: {deleted}")
+    return deleted
 
 __all__=()
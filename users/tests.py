@@ -1,3 +1,831 @@
-from django.test import TestCase
+import base64
+import datetime
+import hashlib
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import redis
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from CalculateBase_backend.celery import app as celery_app
+from . import login_audit
+from .backends import PERMISSIONS_CACHE_KEY, PERMISSIONS_VERSION_KEY, CachedModelBackend
+from .benchmarks import InMemoryRedis
+from .counters import get_user_stats, rebuild_counters
+from .email_backend import CeleryEmail
+from .idempotency import IDEMPOTENCY_CACHE_KEY
+from .models import AuditLog, User, UserCounter, UserInvite
+from .renderers import FastJSONRenderer
+from .revocation import BloomFilter, TokenRevocationList
+from .signals import users_bulk_updated
+from .tasks import (
+    cleanup_expired_sessions, flush_login_audit, send_email_celery, send_invite_email, send_transactional_email,
+)
+from .throttles import SlidingWindowThrottle
+
+
+class BloomFilterTests(TestCase):
+    def test_added_items_are_found(self):
+        bloom = BloomFilter(1024, 5)
+        for i in range(50):
+            bloom.add(f"jti-{i}")
+
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(50)))
+        self.assertNotIn("other", BloomFilter(1024, 5))
+
+
+class TokenRevocationListTests(TestCase):
+    def setUp(self):
+        self.redis = InMemoryRedis()
+        self.revocation_list = TokenRevocationList(
+            client=self.redis, sync_interval=60, bloom_size=4096, hash_count=5
+        )
+
+    def test_revoked_token_is_rejected(self):
+        self.revocation_list.revoke("jti-1", time.time() + 300)
+
+        self.assertTrue(self.revocation_list.is_revoked("jti-1"))
+        self.assertIn(("set", "revoked:jti:jti-1"), self.redis.calls)
+
+    def test_bloom_miss_does_not_query_redis(self):
+        self.revocation_list.revoke("jti-1", time.time() + 300)
+        self.redis.calls.clear()
+
+        self.assertFalse(self.revocation_list.is_revoked("jti-2"))
+        self.assertNotIn("exists", [call[0] for call in self.redis.calls])
+
+    def test_false_positive_is_resolved_by_redis(self):
+        # Маленький фильтр насыщается, и любой JTI даёт ложное срабатывание
+        self.revocation_list = TokenRevocationList(client=self.redis, sync_interval=60, bloom_size=8, hash_count=3)
+        for i in range(20):
+            self.revocation_list.revoke(f"revoked-{i}", time.time() + 300)
+        self.assertIn("jti-2", self.revocation_list.bloom)
+        self.redis.calls.clear()
+
+        self.assertFalse(self.revocation_list.is_revoked("jti-2"))
+        self.assertIn(("exists", "revoked:jti:jti-2"), self.redis.calls)
+
+    def test_expired_token_is_not_stored(self):
+        self.assertFalse(self.revocation_list.revoke("jti-1", time.time() - 1))
+        self.assertFalse(self.revocation_list.is_revoked("jti-1"))
+
+    def test_sync_picks_up_revocations_from_other_processes(self):
+        other_process = TokenRevocationList(client=self.redis, sync_interval=60, bloom_size=4096, hash_count=5)
+        self.assertFalse(other_process.is_revoked("jti-1"))
+
+        self.revocation_list.revoke("jti-1", time.time() + 300)
+        self.assertFalse(other_process.is_revoked("jti-1"))
+
+        other_process.sync()
+        self.assertTrue(other_process.is_revoked("jti-1"))
+
+    def test_unsynced_filter_is_not_trusted(self):
+        self.redis.set("revoked:jti:jti-1", 1, ex=300)
+        with mock.patch.object(self.redis, "pipeline", side_effect=redis.ConnectionError("down")):
+            self.assertTrue(self.revocation_list.is_revoked("jti-1"))
+            self.assertFalse(self.revocation_list.is_revoked("jti-2"))
+        self.assertIsNone(self.revocation_list._last_sync)
+
+    def test_fails_closed_when_redis_is_down_before_first_sync(self):
+        with mock.patch.object(self.redis, "pipeline", side_effect=redis.ConnectionError("down")), \
+                mock.patch.object(self.redis, "exists", side_effect=redis.ConnectionError("down")):
+            self.assertTrue(self.revocation_list.is_revoked("jti-1"))
+
+    def test_sync_is_retried_after_failure(self):
+        self.revocation_list.RETRY_INTERVAL = 0
+        with mock.patch.object(self.redis, "pipeline", side_effect=redis.ConnectionError("down")):
+            self.revocation_list.is_revoked("jti-1")
+        self.revocation_list.is_revoked("jti-1")
+        self.assertIsNotNone(self.revocation_list._last_sync)
+
+    def test_sync_drops_expired_entries(self):
+        self.redis.zadd(TokenRevocationList.INDEX_KEY, {"old": time.time() - 10, "new": time.time() + 300})
+
+        self.revocation_list.sync()
+
+        self.assertEqual(list(self.redis.sorted_sets[TokenRevocationList.INDEX_KEY]), ["new"])
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False)
+class JWTRevocationTests(TestCase):
+    def setUp(self):
+        self.revocation_list = TokenRevocationList(
+            client=InMemoryRedis(), sync_interval=60, bloom_size=4096, hash_count=5
+        )
+        patcher = mock.patch("users.revocation._revocation_list", self.revocation_list)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            "user@example.com", "Str0ng-pass!", is_active=True, name="User", role=User.Roles.MANAGER
+        )
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        response = self.client.post("/users/auth/jwt/logout/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 204)
+
+        response = self.client.post("/users/invite/send/", {}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+        response = APIClient().post("/users/auth/jwt/refresh/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_returns_503_when_redis_is_down(self):
+        with mock.patch.object(self.revocation_list.client, "pipeline", side_effect=redis.ConnectionError("down")):
+            response = self.client.post("/users/auth/jwt/logout/", {"refresh": str(self.refresh)}, format="json")
+        self.assertEqual(response.status_code, 503)
+
+    def test_redis_client_uses_short_timeouts(self):
+        client = TokenRevocationList().client
+        kwargs = client.connection_pool.connection_kwargs
+        self.assertEqual(kwargs["socket_connect_timeout"], settings.TOKEN_REVOCATION_SOCKET_TIMEOUT)
+        self.assertEqual(kwargs["socket_timeout"], settings.TOKEN_REVOCATION_SOCKET_TIMEOUT)
+
+    def test_not_revoked_token_is_accepted(self):
+        response = self.client.post("/users/invite/send/", {}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class CeleryRoutingTests(SimpleTestCase):
+    def setUp(self):
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.update(CELERY_TASK_ALWAYS_EAGER=False)
+        self.addCleanup(celery_app.conf.update, CELERY_TASK_ALWAYS_EAGER=eager)
+
+        self.connection = celery_app.connection_for_write("memory://")
+        self.addCleanup(self.connection.release)
+        self.producer = celery_app.amqp.Producer(self.connection)
+
+    def test_invite_is_delivered_ahead_of_bulk_backlog(self):
+        for i in range(50):
+            send_email_celery.apply_async(args=[[{"to": [f"bulk{i}@example.com"]}]], producer=self.producer)
+        send_invite_email.apply_async(args=[[{"to": ["invite@example.com"]}]], producer=self.producer)
+
+        with self.connection.SimpleQueue(celery_app.amqp.queues["invites"]) as invites:
+            message = invites.get(timeout=1)
+            message.ack()
+        self.assertEqual(message.headers["task"], "users.tasks.send_invite_email")
+        self.assertEqual(message.properties["priority"], 0)
+
+        with self.connection.SimpleQueue(celery_app.amqp.queues["bulk_mail"]) as bulk_mail:
+            self.assertEqual(bulk_mail.qsize(), 50)
+            bulk_mail.clear()
+
+    def test_email_backend_mail_skips_bulk_backlog(self):
+        for i in range(50):
+            send_email_celery.apply_async(args=[[{"to": [f"bulk{i}@example.com"]}]], producer=self.producer)
+        with mock.patch.object(send_transactional_email, "delay",
+                               side_effect=lambda emails: send_transactional_email.apply_async(
+                                   args=[emails], producer=self.producer)):
+            CeleryEmail().send_messages([EmailMultiAlternatives("Сброс пароля", "Текст", to=["user@example.com"])])
+
+        with self.connection.SimpleQueue(celery_app.amqp.queues["invites"]) as invites:
+            message = invites.get(timeout=1)
+            message.ack()
+        self.assertEqual(message.headers["task"], "users.tasks.send_transactional_email")
+
+        with self.connection.SimpleQueue(celery_app.amqp.queues["bulk_mail"]) as bulk_mail:
+            self.assertEqual(bulk_mail.qsize(), 50)
+            bulk_mail.clear()
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False, ALLOWED_HOSTS=["*"])
+class PermissionCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(name="Менеджеры")
+        self.group.permissions.add(Permission.objects.get(codename="view_user"))
+        self.user = User.objects.create_user(
+            "staff@example.com", "Str0ng-pass!", is_active=True, is_staff=True, name="Staff", role=User.Roles.MANAGER
+        )
+        self.user.groups.add(self.group)
+
+    def permission_queries(self, queries):
+        return [query for query in queries.captured_queries if "auth_permission" in query["sql"]]
+
+    def test_warm_admin_page_does_not_query_permissions(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get("/admin/users/user/").status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/admin/users/user/").status_code, 200)
+        self.assertEqual(self.permission_queries(queries), [])
+
+    def test_group_permission_change_invalidates_cache(self):
+        self.assertFalse(User.objects.get(pk=self.user.pk).has_perm("users.change_user"))
+
+        self.group.permissions.add(Permission.objects.get(codename="change_user"))
+
+        self.assertTrue(User.objects.get(pk=self.user.pk).has_perm("users.change_user"))
+
+    def test_group_membership_change_invalidates_cache(self):
+        self.assertTrue(User.objects.get(pk=self.user.pk).has_perm("users.view_user"))
+
+        self.user.groups.remove(self.group)
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).has_perm("users.view_user"))
+
+    def test_evicted_version_does_not_revive_stale_permissions(self):
+        self.assertTrue(User.objects.get(pk=self.user.pk).has_perm("users.view_user"))
+        self.user.groups.remove(self.group)
+        # Запись со старым набором прав пережила вытеснение ключа версии
+        stale = cache.get(PERMISSIONS_CACHE_KEY.format(user_id=self.user.pk))
+        cache.delete(PERMISSIONS_VERSION_KEY)
+        cache.set(PERMISSIONS_CACHE_KEY.format(user_id=self.user.pk), (stale[0], {"users.view_user"}))
+
+        self.assertFalse(User.objects.get(pk=self.user.pk).has_perm("users.view_user"))
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False, ALLOWED_HOSTS=["*"])
+class UserCounterTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin@example.com", "Str0ng-pass!", name="Admin")
+        self.users = [
+            User.objects.create_user(f"user{i}@example.com", "Str0ng-pass!", name=f"User {i}", role=User.Roles.MANAGER)
+            for i in range(3)
+        ]
+
+    def assertCountersMatchTable(self):
+        stats = get_user_stats()
+        rebuild_counters()
+        self.assertEqual(get_user_stats(), stats)
+        self.assertEqual(stats["total"], User.objects.count())
+
+    def test_save_and_delete_update_counters(self):
+        user = User.objects.get(pk=self.users[0].pk)
+        user.is_active = True
+        user.save()
+        User.objects.get(pk=self.users[1].pk).delete()
+
+        stats = get_user_stats()
+        self.assertEqual(stats["by_role"][User.Roles.MANAGER]["active"], 1)
+        self.assertEqual(stats["by_role"][User.Roles.MANAGER]["total"], 2)
+        self.assertCountersMatchTable()
+
+    def test_deferred_load_does_not_break_counters(self):
+        user = User.objects.only("id", "name").get(pk=self.users[0].pk)
+        user.name = "Renamed"
+        user.save()
+
+        self.assertCountersMatchTable()
+
+    def test_deferred_load_with_changed_status_updates_counters(self):
+        user = User.objects.only("id", "is_archived").get(pk=self.users[0].pk)
+        user.is_archived = True
+        user.save()
+
+        self.assertEqual(get_user_stats()["by_role"][User.Roles.MANAGER]["archived"], 1)
+        self.assertCountersMatchTable()
+
+    def test_stats_endpoint_is_staff_only(self):
+        client = APIClient()
+        user = User.objects.get(pk=self.users[0].pk)
+        user.is_active = True
+        user.save()
+        client.force_authenticate(user)
+        self.assertEqual(client.get("/users/stats/").status_code, 403)
+
+        client.force_authenticate(self.admin)
+        self.assertEqual(client.get("/users/stats/").status_code, 200)
+
+    def test_admin_bulk_archive_updates_counters(self):
+        self.client.force_login(self.admin)
+        response = self.client.post("/admin/users/user/", {
+            "action": "archive_users",
+            "_selected_action": [str(user.pk) for user in self.users[:2]],
+        })
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(get_user_stats()["by_role"][User.Roles.MANAGER]["archived"], 2)
+        self.assertCountersMatchTable()
+
+    def test_stats_do_not_scan_users_table(self):
+        with CaptureQueriesContext(connection) as queries:
+            get_user_stats()
+        self.assertFalse(any("users_user\"" in query["sql"] for query in queries.captured_queries))
+        self.assertEqual(UserCounter.objects.filter(count__lt=0).count(), 0)
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False)
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(SlidingWindowThrottle, "THROTTLE_RATES", {
+            "login_ip": "10/min",
+            "login_email": "3/min",
+            "invite_sender": "2/hour",
+        })
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(
+            "user@example.com", "Str0ng-pass!", is_active=True, name="User", role=User.Roles.MANAGER
+        )
+        self.client = APIClient()
+
+    def login(self, email, password="wrong-password"):
+        return self.client.post("/users/auth/jwt/create/", {"email": email, "password": password}, format="json")
+
+    def test_login_is_throttled_per_email_before_password_check(self):
+        for _ in range(3):
+            self.assertEqual(self.login("User@example.com").status_code, 401)
+
+        with mock.patch("users.models.User.check_password") as check_password, \
+                CaptureQueriesContext(connection) as queries:
+            response = self.login("user@example.com", "Str0ng-pass!")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        check_password.assert_not_called()
+        self.assertEqual(len(queries), 0)
+
+        self.assertEqual(self.login("other@example.com").status_code, 401)
+
+    def test_login_is_throttled_per_ip(self):
+        for i in range(10):
+            self.login(f"user{i}@example.com")
+
+        self.assertEqual(self.login("new@example.com").status_code, 429)
+
+    def test_spoofed_forwarded_for_does_not_reset_ip_bucket(self):
+        for i in range(10):
+            self.client.post("/users/auth/jwt/create/", {"email": f"user{i}@example.com", "password": "wrong"},
+                             format="json", HTTP_X_FORWARDED_FOR=f"10.0.0.{i}")
+
+        response = self.client.post("/users/auth/jwt/create/", {"email": "new@example.com", "password": "wrong"},
+                                    format="json", HTTP_X_FORWARDED_FOR="10.0.1.1")
+        self.assertEqual(response.status_code, 429)
+
+    def test_window_slides_instead_of_resetting(self):
+        throttle_time = mock.patch.object(SlidingWindowThrottle, "timer")
+        timer = throttle_time.start()
+        self.addCleanup(throttle_time.stop)
+
+        timer.return_value = 60 * 1000 + 50
+        for _ in range(3):
+            self.login("user@example.com")
+        # Новое минутное окно началось, но 50 секунд из прошлого ещё учитываются
+        timer.return_value = 60 * 1001 + 10
+        self.assertEqual(self.login("user@example.com").status_code, 429)
+        timer.return_value = 60 * 1001 + 50
+        self.assertEqual(self.login("user@example.com").status_code, 401)
+
+    def test_invites_are_throttled_per_sender(self):
+        self.client.force_authenticate(self.user)
+        for i in range(2):
+            response = self.client.post("/users/invite/send/", {
+                "email": f"invite{i}@example.com", "name": "Invite", "role": User.Roles.MANAGER
+            }, format="json")
+            self.assertEqual(response.status_code, 201)
+
+        response = self.client.post("/users/invite/send/", {
+            "email": "invite3@example.com", "name": "Invite", "role": User.Roles.MANAGER
+        }, format="json")
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(User.objects.filter(email="invite3@example.com").exists())
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False)
+class IdempotentInviteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.sender = User.objects.create_user(
+            "sender@example.com", "Str0ng-pass!", is_active=True, name="Sender", role=User.Roles.MANAGER
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.sender)
+        self.payload = {"email": "invite@example.com", "name": "Invite", "role": User.Roles.MANAGER}
+
+    def invite(self, payload=None, key="key-1"):
+        headers = {"HTTP_IDEMPOTENCY_KEY": key} if key else {}
+        return self.client.post("/users/invite/send/", payload or self.payload, format="json", **headers)
+
+    def test_replay_returns_cached_response_without_db_or_celery(self):
+        first = self.invite()
+        self.assertEqual(first.status_code, 201)
+
+        with mock.patch("users.views.send_invite_email.delay") as delay, \
+                CaptureQueriesContext(connection) as queries:
+            replay = self.invite()
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(len(queries), 0)
+        delay.assert_not_called()
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.invite()
+
+        response = self.invite({**self.payload, "email": "other@example.com"})
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(User.objects.filter(email="other@example.com").exists())
+
+    @override_settings(IDEMPOTENCY_LOCK_TIMEOUT=0.5)
+    def test_concurrent_duplicate_waits_for_first_response(self):
+        cache_key = IDEMPOTENCY_CACHE_KEY.format(scope=self.sender.pk, key=hashlib.sha256(b"key-1").hexdigest())
+        lock_key = f"{cache_key}:lock"
+        self.invite()
+        # Первый запрос «ещё выполняется»: ответа нет, замок взят
+        stored = cache.get(cache_key)
+        cache.delete(cache_key)
+        cache.set(lock_key, 1)
+
+        response = self.invite()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Retry-After"], "1")
+
+        def finish_first_request():
+            cache.set(cache_key, stored)
+            cache.delete(lock_key)
+
+        timer = threading.Timer(0.1, finish_first_request)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        with mock.patch("users.views.send_invite_email.delay") as delay:
+            response = self.invite()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        delay.assert_not_called()
+
+    def test_response_saved_before_lock_is_replayed(self):
+        cache_key = IDEMPOTENCY_CACHE_KEY.format(scope=self.sender.pk, key=hashlib.sha256(b"key-1").hexdigest())
+        first = self.invite()
+        stored = cache.get(cache_key)
+        cache.delete(cache_key)
+        add = cache.add
+
+        def add_after_first_request_finished(key, *args, **kwargs):
+            if key == f"{cache_key}:lock":
+                # Первый запрос сохранил ответ и снял замок между get() и add()
+                cache.set(cache_key, stored)
+            return add(key, *args, **kwargs)
+
+        with mock.patch.object(cache, "add", side_effect=add_after_first_request_finished), \
+                mock.patch("users.views.send_invite_email.delay") as delay:
+            response = self.invite()
+        self.assertEqual(response.json(), first.json())
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        delay.assert_not_called()
+
+    def test_expired_lock_taken_by_another_request_is_kept(self):
+        lock_key = IDEMPOTENCY_CACHE_KEY.format(
+            scope=self.sender.pk, key=hashlib.sha256(b"key-1").hexdigest()
+        ) + ":lock"
+
+        def lock_expired_and_taken(*args, **kwargs):
+            cache.set(lock_key, "other-request")
+
+        with mock.patch("users.views.send_invite_email.delay", side_effect=lock_expired_and_taken):
+            self.assertEqual(self.invite().status_code, 201)
+        self.assertEqual(cache.get(lock_key), "other-request")
+
+    def test_inactive_user_is_reinvited(self):
+        self.invite(key=None)
+        old_token = UserInvite.objects.get(user__email="invite@example.com").invite_token
+
+        response = self.invite({**self.payload, "role": User.Roles.ADMIN}, key=None)
+        self.assertEqual(response.status_code, 200)
+        invite = UserInvite.objects.get(user__email="invite@example.com")
+        self.assertNotEqual(invite.invite_token, old_token)
+        self.assertEqual(invite.user.role, User.Roles.ADMIN)
+
+    def test_deactivated_user_is_not_reinvited(self):
+        self.invite(key=None)
+        user = User.objects.get(email="invite@example.com")
+        user.set_password("Str0ng-pass!")
+        user.is_active = False
+        user.save()
+        UserInvite.objects.filter(user=user).update(used=True)
+
+        response = self.invite({**self.payload, "role": User.Roles.ADMIN}, key=None)
+        self.assertEqual(response.status_code, 409)
+        user.refresh_from_db()
+        self.assertEqual(user.role, User.Roles.MANAGER)
+        self.assertTrue(UserInvite.objects.get(user=user).used)
+
+        # Даже с неиспользованным приглашением: пароль уже был установлен
+        UserInvite.objects.filter(user=user).update(used=False)
+        self.assertEqual(self.invite(key=None).status_code, 409)
+
+    def test_active_user_is_not_reinvited(self):
+        response = self.invite({**self.payload, "email": self.sender.email}, key=None)
+        self.assertEqual(response.status_code, 409)
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=True, LOGIN_AUDIT_BATCH_SIZE=3, LOGIN_AUDIT_FLUSH_INTERVAL=60)
+class LoginAuditTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(login_audit.flush)
+        self.user = User.objects.create_user(
+            "user@example.com", "Str0ng-pass!", is_active=True, name="User", role=User.Roles.MANAGER
+        )
+
+    def test_last_login_is_written_once_per_interval(self):
+        with CaptureQueriesContext(connection) as queries, mock.patch("users.login_audit.flush_login_audit.delay"):
+            login_audit.record_login(self.user.pk, str(self.user), method="jwt_create")
+            login_audit.record_login(self.user.pk, str(self.user), method="jwt_create")
+        updates = [query for query in queries.captured_queries if "last_login" in query["sql"]]
+        self.assertEqual(len(updates), 1)
+
+    def test_session_login_does_not_use_django_update_last_login(self):
+        with mock.patch("users.login_audit.flush_login_audit.delay"):
+            self.assertTrue(self.client.login(email="user@example.com", password="Str0ng-pass!"))
+            first = User.objects.get(pk=self.user.pk).last_login
+            self.client.logout()
+            self.assertTrue(self.client.login(email="user@example.com", password="Str0ng-pass!"))
+        self.assertIsNotNone(first)
+        self.assertEqual(User.objects.get(pk=self.user.pk).last_login, first)
+
+    def test_events_are_flushed_in_batches(self):
+        with mock.patch("users.login_audit.flush_login_audit.delay") as delay:
+            for _ in range(3):
+                login_audit.record_logout(self.user.pk, str(self.user), method="jwt")
+        delay.assert_called_once()
+        self.assertEqual(len(delay.call_args.args[0]), 3)
+
+    @override_settings(LOGIN_AUDIT_FLUSH_INTERVAL=0.05)
+    def test_single_event_is_flushed_by_timer(self):
+        flushed = threading.Event()
+        with mock.patch("users.login_audit.flush_login_audit.delay", side_effect=lambda events: flushed.set()):
+            login_audit.record_logout(self.user.pk, str(self.user), method="jwt")
+            self.assertTrue(flushed.wait(2))
+
+    def test_flush_keeps_event_time_and_resolves_user(self):
+        at = timezone.now() - timezone.timedelta(minutes=10)
+        flush_login_audit([{
+            "user_id": str(self.user.pk),
+            "action": AuditLog.ACTION_TOKEN_REFRESH,
+            "object_repr": None,
+            "changes": {"method": "jwt_refresh", "ip": None, "at": at.isoformat()},
+        }])
+
+        entry = AuditLog.objects.get(action=AuditLog.ACTION_TOKEN_REFRESH)
+        self.assertEqual(entry.timestamp, at)
+        self.assertEqual(entry.created_at, at)
+        self.assertEqual(entry.object_repr, str(self.user))
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def payload(self):
+        return {
+            "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "email": "user@example.com",
+            "name": "Пользователь\u2028с\u2029разделителями",
+            "role": gettext_lazy("Менеджер"),
+            "balance": Decimal("10.50"),
+            "ratio": 0.25,
+            "created_at": datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            "birthday": datetime.date(1990, 5, 17),
+            "at": datetime.time(12, 30, 15, 250000),
+            "tags": ["a", "б", None, True, 1],
+            1: "non-string key",
+        }
+
+    def test_output_matches_drf_renderer(self):
+        data = [self.payload() for _ in range(3)]
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_big_integer_falls_back_to_drf_renderer(self):
+        data = {"value": 2 ** 70}
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False)
+class UserDirectoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            "staff@example.com", "Str0ng-pass!", is_active=True, is_staff=True, name="Staff", role=User.Roles.ADMIN
+        )
+        self.users = [
+            User.objects.create_user(
+                f"user{i}@example.com", "Str0ng-pass!", name=f"User {i}", role=User.Roles.MANAGER,
+                is_active=i % 2 == 0,
+            )
+            for i in range(5)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def get(self, params=None, **headers):
+        return self.client.get("/users/directory/", params or {}, **headers)
+
+    def test_cursor_pagination_walks_all_users_once(self):
+        response = self.get({"page[size]": 2})
+        ids = [item["id"] for item in response.json()["data"]]
+        while response.json()["links"]["next"]:
+            response = self.client.get(response.json()["links"]["next"])
+            ids += [item["id"] for item in response.json()["data"]]
+
+        expected = User.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        self.assertEqual(ids, [str(pk) for pk in expected])
+
+    def test_invalid_cursor_returns_404(self):
+        self.assertEqual(self.get({"page[cursor]": "not-a-cursor"}).status_code, 404)
+
+    def test_cursor_with_bad_id_or_naive_datetime_returns_404(self):
+        for raw in (f"{timezone.now().isoformat()}|not-a-uuid", f"2024-01-01T00:00:00|{self.staff.pk}"):
+            cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+            self.assertEqual(self.get({"page[cursor]": cursor}).status_code, 404)
+
+    def test_filters(self):
+        response = self.get({"filter[role]": User.Roles.MANAGER, "filter[is_active]": "false"})
+
+        emails = {item["attributes"]["email"] for item in response.json()["data"]}
+        self.assertEqual(emails, {"user1@example.com", "user3@example.com"})
+
+    def test_sparse_fieldsets_limit_attributes_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get({"fields[users]": "email"})
+
+        self.assertEqual(set(response.json()["data"][0]["attributes"]), {"email"})
+        select = next(query["sql"] for query in queries.captured_queries if 'FROM "users_user"' in query["sql"])
+        self.assertNotIn('"users_user"."name"', select)
+
+    def test_not_modified_until_users_change(self):
+        etag = self.get()["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+        self.users[0].name = "Renamed"
+        self.users[0].save()
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_non_staff_sees_only_themselves(self):
+        self.users[0].refresh_from_db()
+        self.client.force_authenticate(self.users[0])
+
+        response = self.get()
+        self.assertEqual([item["id"] for item in response.json()["data"]], [str(self.users[0].pk)])
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False, SESSION_USER_CACHE_TTL=30)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        CachedModelBackend._cache.clear()
+        self.backend = CachedModelBackend()
+        self.user = User.objects.create_user(
+            "user@example.com", "Str0ng-pass!", is_active=True, name="User", role=User.Roles.MANAGER
+        )
+
+    def assertUserQueries(self, count):
+        with CaptureQueriesContext(connection) as queries:
+            user = self.backend.get_user(self.user.pk)
+        self.assertEqual(len(queries), count)
+        return user
+
+    def test_user_is_cached_until_ttl_expires(self):
+        self.assertUserQueries(1)
+        self.assertUserQueries(0)
+
+        with mock.patch("users.backends.time.monotonic", return_value=time.monotonic() + 31):
+            self.assertUserQueries(1)
+
+    def test_save_invalidates_cached_user(self):
+        self.assertUserQueries(1)
+        self.user.name = "Renamed"
+        self.user.save()
+
+        self.assertEqual(self.assertUserQueries(1).name, "Renamed")
+
+    def test_delete_invalidates_cached_user(self):
+        self.assertUserQueries(1)
+        User.objects.get(pk=self.user.pk).delete()
+
+        self.assertIsNone(self.assertUserQueries(1))
+
+    def test_bulk_update_invalidates_cached_user(self):
+        self.assertUserQueries(1)
+        User.objects.filter(pk=self.user.pk).update(is_archived=True)
+        users_bulk_updated.send(sender=User, user_ids=[self.user.pk], fields={"is_archived": True})
+
+        self.assertTrue(self.assertUserQueries(1).is_archived)
+
+    def test_change_in_another_process_invalidates_cached_user(self):
+        self.assertUserQueries(1)
+        # В другом процессе запись в памяти осталась: сбрасывает её только поколение в общем кэше
+        stale = CachedModelBackend._cache[str(self.user.pk)]
+        self.user.name = "Renamed"
+        self.user.save()
+        CachedModelBackend._cache[str(self.user.pk)] = stale
+
+        self.assertEqual(self.assertUserQueries(1).name, "Renamed")
+        self.assertUserQueries(0)
+
+    def test_cache_down_reads_user_from_db(self):
+        self.assertUserQueries(1)
+
+        with mock.patch.object(cache, "get", side_effect=redis.ConnectionError("down")):
+            self.assertEqual(self.assertUserQueries(1).pk, self.user.pk)
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False, ALLOWED_HOSTS=["*"])
+class SessionFallbackTests(TestCase):
+    def test_admin_works_with_cache_down(self):
+        admin = User.objects.create_superuser("admin@example.com", "Str0ng-pass!", name="Admin")
+        self.client.force_login(admin)
+
+        down = redis.ConnectionError("down")
+        with mock.patch.object(caches["sessions"], "get", side_effect=down), \
+                mock.patch.object(caches["sessions"], "set", side_effect=down), \
+                mock.patch.object(caches["sessions"], "has_key", side_effect=down), \
+                mock.patch.object(caches["default"], "get_many", side_effect=down):
+            self.assertEqual(self.client.get("/admin/users/user/").status_code, 200)
+
+
+@override_settings(SESSION_CLEANUP_BATCH_SIZE=2, SESSION_CLEANUP_MAX_BATCHES=2)
+class CleanupExpiredSessionsTests(TestCase):
+    def test_deletes_expired_sessions_in_limited_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f"expired{i}", session_data="", expire_date=now - timezone.timedelta(days=1))
+        Session.objects.create(session_key="live", session_data="", expire_date=now + timezone.timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(cleanup_expired_sessions(), 4)
+        self.assertEqual(len([query for query in queries.captured_queries if query["sql"].startswith("DELETE")]), 2)
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertTrue(Session.objects.filter(session_key="live").exists())
+
+        self.assertEqual(cleanup_expired_sessions(), 1)
+
+
+@override_settings(LOGIN_AUDIT_ENABLED=False, ALLOWED_HOSTS=["*"], ADMIN_BULK_BATCH_SIZE=2, EMAIL_BATCH_SIZE=2)
+class UserAdminActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser("admin@example.com", "Str0ng-pass!", name="Admin")
+        self.users = [
+            User.objects.create_user(f"user{i}@example.com", None, name=f"User {i}", role=User.Roles.MANAGER)
+            for i in range(3)
+        ]
+        self.client.force_login(self.admin)
+
+    def run_action(self, action, users):
+        return self.client.post("/admin/users/user/", {
+            "action": action,
+            "_selected_action": [str(user.pk) for user in users],
+        })
+
+    def test_view_only_staff_cannot_run_actions(self):
+        viewer = User.objects.create_user(
+            "viewer@example.com", "Str0ng-pass!", is_active=True, is_staff=True, name="Viewer", role=User.Roles.MANAGER
+        )
+        viewer.user_permissions.add(Permission.objects.get(codename="view_user"))
+        self.client.force_login(viewer)
+
+        # Без права change у пользователя не остаётся ни одного действия
+        self.assertIsNone(self.client.get("/admin/users/user/").context["action_form"])
+        self.assertNotEqual(self.run_action("deactivate_users", [self.admin]).status_code, 302)
+
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+
+    def test_archive_runs_one_update_and_one_audit_insert_per_batch(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.run_action("archive_users", self.users).status_code, 302)
+
+        sqls = [query["sql"] for query in queries.captured_queries]
+        self.assertEqual(len([sql for sql in sqls if sql.startswith('UPDATE "users_user"')]), 2)
+        self.assertEqual(len([sql for sql in sqls if sql.startswith('INSERT INTO "users_auditlog"')]), 2)
+        self.assertEqual(User.objects.filter(is_archived=True).count(), 3)
+        self.assertEqual(AuditLog.objects.filter(action=AuditLog.ACTION_ARCHIVE_USER).count(), 3)
+
+    def test_resend_invites_rotates_tokens_and_sends_in_chunks(self):
+        old_tokens = set(UserInvite.objects.bulk_create([
+            UserInvite(user=user, expires_at=timezone.now()) for user in self.users
+        ]))
+        old_tokens = {invite.invite_token for invite in old_tokens}
+
+        with mock.patch("users.admin.send_invite_email.apply_async") as apply_async:
+            self.assertEqual(self.run_action("resend_invites", self.users).status_code, 302)
+
+        new_tokens = set(UserInvite.objects.values_list("invite_token", flat=True))
+        self.assertEqual(len(new_tokens), 3)
+        self.assertFalse(new_tokens & old_tokens)
+        sent = [email["to"][0] for call in apply_async.call_args_list for email in call.kwargs["args"][0]]
+        self.assertEqual(sorted(sent), sorted(user.email for user in self.users))
+        self.assertTrue(all(len(call.kwargs["args"][0]) <= 2 for call in apply_async.call_args_list))
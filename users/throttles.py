@@ -0,0 +1,104 @@
+import hashlib
+import math
+
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Скользящее окно поверх кэша Django: счётчики текущего и предыдущего
+    фиксированных окон, вес предыдущего убывает по мере хода текущего.
+
+    В отличие от SimpleRateThrottle не хранит список отметок времени
+    (get + set на каждый запрос с гонкой между ними): счётчик увеличивается
+    атомарно, на Redis — один pipeline (INCR, EXPIRE, GET) за запрос.
+    Отклонённые запросы тоже считаются, поэтому непрерывный перебор остаётся
+    заблокированным.
+    """
+
+    cache_format = "throttle:%(scope)s:%(ident)s"
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current, previous = self._increment(f"{key}:{window}", f"{key}:{window - 1}")
+
+        self.previous_weight = previous * (1 - self.elapsed / self.duration)
+        self.current = current
+        return current + self.previous_weight <= self.num_requests
+
+    def _increment(self, key, previous_key):
+        """Атомарное увеличение счётчика текущего окна и чтение предыдущего."""
+        timeout = 2 * self.duration
+        if isinstance(self.cache, RedisCache):
+            key = self.cache.make_and_validate_key(key)
+            previous_key = self.cache.make_and_validate_key(previous_key)
+            pipe = self.cache._cache.get_client(key, write=True).pipeline()
+            pipe.incr(key)
+            pipe.expire(key, timeout)
+            pipe.get(previous_key)
+            current, _, previous = pipe.execute()
+            return current, int(previous or 0)
+
+        previous = self.cache.get(previous_key, 0)
+        if self.cache.add(key, 1, timeout):
+            return 1, previous
+        try:
+            return self.cache.incr(key), previous
+        except ValueError:
+            # Ключ истёк между add() и incr()
+            self.cache.set(key, 1, timeout)
+            return 1, previous
+
+    def wait(self):
+        """Через сколько секунд оценка опустится ниже лимита."""
+        if self.current > self.num_requests:
+            return self.duration - self.elapsed
+        # Лимит превышен за счёт предыдущего окна: ждём, пока его вес убудет
+        excess = self.current + self.previous_weight - self.num_requests
+        previous = self.previous_weight / (1 - self.elapsed / self.duration)
+        return min(self.duration - self.elapsed, math.ceil(excess / previous * self.duration))
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    """Попытки входа с одного IP."""
+
+    scope = "login_ip"
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    """Попытки входа в одну учётную запись, с любых IP."""
+
+    scope = "login_email"
+
+    def get_cache_key(self, request, view):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        if not email or not isinstance(email, str):
+            return None
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+
+class InviteSenderThrottle(SlidingWindowThrottle):
+    """Приглашения от одного пользователя."""
+
+    scope = "invite_sender"
+
+    def get_cache_key(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+        return self.cache_format % {"scope": self.scope, "ident": request.user.pk}
+
+__all__ = ()
@@ -1,5 +1,8 @@
 from django.urls import path, include
-from .views import SendInviteView, ConfirmInvitePage
+from .views import (
+    SendInviteView, ConfirmInvitePage, LogoutView, UserDirectoryView, UserStatsView,
+    ThrottledTokenObtainPairView,
+)
 
 urlpatterns = [
     path('invite/send/',
@@ -12,6 +15,26 @@ urlpatterns = [
          name='confirm_invite_page'
          ),
 
+    path('directory/',
+         UserDirectoryView.as_view(),
+         name='user_directory'
+         ),
+
+    path('stats/',
+         UserStatsView.as_view(),
+         name='user_stats'
+         ),
+
+    path('auth/jwt/create/',
+         ThrottledTokenObtainPairView.as_view(),
+         name='jwt-create'
+         ),
+
+    path('auth/jwt/logout/',
+         LogoutView.as_view(),
+         name='jwt_logout'
+         ),
+
     path(
         "auth/",
         include("djoser.urls"
@@ -0,0 +1,10 @@
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """Разбиение последовательности на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+__all__ = ()
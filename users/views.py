@@ -1,7 +1,7 @@
 from django.template.loader import render_to_string
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from urllib.parse import urlencode
-from .authentication import CsrfExemptSessionAuthentication
+from .authentication import CsrfExemptSessionAuthentication, IsActiveAndNotArchived
 from .models import User, AuditLog
 import uuid
 from django.shortcuts import render, redirect, get_object_or_404
@@ -9,17 +9,36 @@ from django.views import View
 from django.contrib import messages
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.utils import timezone
+from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, status
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+import hashlib
 from .mixins import AuditLogMixin
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings
 from .models import UserInvite
-from .tasks import send_email_celery  # импортируем нашу задачу
+from .tasks import send_invite_email  # импортируем нашу задачу
+from .serializers import LogoutSerializer, UserDirectorySerializer
+from .pagination import KeysetCursorPagination
+from .renderers import FastJSONAPIRenderer
+from .revocation import RevocationUnavailable, get_revocation_list
+from . import login_audit
+from .counters import get_user_stats
+from .directory import get_directory_version
+from .idempotency import idempotent
+from .throttles import InviteSenderThrottle, LoginEmailThrottle, LoginIPThrottle
+from rest_framework_simplejwt.views import TokenObtainPairView
 
 
 class SendInviteView(APIView):
+    throttle_classes = (InviteSenderThrottle,)
+
+    @idempotent
     def post(self, request):
         email = request.data.get("email")
         name = request.data.get("name")
@@ -28,18 +47,34 @@ class SendInviteView(APIView):
         if not all([email, name, role]):
             return Response({"error": "Недостаточно данных"}, status=400)
 
-        user = User.objects.create(
-            email=email,
-            name=name,
-            role=role,
-            is_active=False,
-        )
+        email = User.objects.normalize_email(email)
+        with transaction.atomic():
+            user, created = User.objects.get_or_create(
+                email=email,
+                defaults={"name": name, "role": role, "is_active": False, "password": make_password(None)},
+            )
+            if not created:
+                # Повторное приглашение — только тем, кто ещё ни разу его не
+                # подтвердил; деактивированных администратором не трогаем
+                invite = UserInvite.objects.select_for_update().filter(user=user, used=False).first()
+                # Пустой пароль — пользователи, созданные до make_password(None)
+                has_password = bool(user.password) and user.has_usable_password()
+                if invite is None or user.is_active or user.is_archived or has_password:
+                    return Response({"error": "Пользователь уже зарегистрирован"}, status=409)
+                if (user.name, user.role) != (name, role):
+                    user.name, user.role = name, role
+                    user.save(update_fields=["name", "role", "updated_at"])
 
-        invite = UserInvite.objects.create(
-            user=user,
-            invite_token=uuid.uuid4(),
-            expires_at=timezone.now() + timezone.timedelta(days=3),
-        )
+            invite_fields = {
+                "invite_token": uuid.uuid4(),
+                "expires_at": timezone.now() + timezone.timedelta(days=3),
+            }
+            if created:
+                invite = UserInvite.objects.create(user=user, **invite_fields)
+            else:
+                for field, value in invite_fields.items():
+                    setattr(invite, field, value)
+                invite.save(update_fields=list(invite_fields))
 
         invite_link = f"https://your-domain.com/invite/confirm/{invite.invite_token}"
 
@@ -64,8 +99,10 @@ class SendInviteView(APIView):
             "alternatives": [(html_content, "text/html")]
         }
 
-        send_email_celery.delay([email_data])
-        return Response({"status": "invite_sent"}, status=201)
+        send_invite_email.delay([email_data])
+        if created:
+            return Response({"status": "invite_sent"}, status=201)
+        return Response({"status": "invite_resent"}, status=200)
 
 
 
@@ -126,3 +163,111 @@ class ConfirmInvitePage(View, AuditLogMixin):
         return redirect(f"{frontend_url}?{params}")
 
 
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """
+    Получение JWT (djoser auth/jwt/create/) с лимитами по IP и email:
+    лишние попытки отклоняются до проверки пароля и обращений к БД.
+    """
+
+    throttle_classes = (LoginIPThrottle, LoginEmailThrottle)
+
+
+class LogoutView(APIView):
+    """Выход: отзыв refresh-токена и текущего access-токена."""
+
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data["refresh"]
+
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response({"error": "Токен принадлежит другому пользователю"}, status=400)
+
+        revocation_list = get_revocation_list()
+        try:
+            revocation_list.revoke_token(refresh)
+            if request.auth is not None:
+                revocation_list.revoke_token(request.auth)
+        except RevocationUnavailable:
+            return Response(
+                {"error": "Сервис отзыва токенов недоступен, повторите выход позже"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        login_audit.record_logout(request.user.pk, str(request.user), method="jwt", request=request)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserDirectoryView(generics.ListAPIView):
+    """
+    Справочник пользователей в формате JSON:API.
+
+    Фильтры: filter[role], filter[is_active], filter[is_archived].
+    Поля: fields[users]=email,role — из БД читаются только они (.only()).
+    Как и список пользователей djoser (HIDE_USERS), не-staff видит только себя.
+    Ответ помечается слабым ETag и Last-Modified по метке изменения
+    пользователей (users.directory, без запроса к БД); при совпадении
+    отдаётся 304 без выборки и сериализации.
+    """
+
+    serializer_class = UserDirectorySerializer
+    pagination_class = KeysetCursorPagination
+    renderer_classes = (FastJSONAPIRenderer,)
+    resource_name = "users"
+
+    bool_filters = ("is_active", "is_archived")
+    # Поля, без которых не работает пагинация
+    required_fields = ("id", "created_at")
+
+    def get_queryset(self):
+        queryset = User.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(pk=self.request.user.pk)
+        params = self.request.query_params
+
+        role = params.get("filter[role]")
+        if role:
+            queryset = queryset.filter(role=role)
+
+        for field in self.bool_filters:
+            value = params.get(f"filter[{field}]")
+            if value is not None:
+                queryset = queryset.filter(**{field: value.lower() in ("1", "true")})
+
+        return queryset
+
+    def get_only_fields(self):
+        fields = self.serializer_class.Meta.fields
+        requested = self.request.query_params.get(f"fields[{self.resource_name}]")
+        if requested:
+            fields = [field for field in fields if field in requested.split(",")]
+        return set(fields) | set(self.required_fields)
+
+    def get(self, request, *args, **kwargs):
+        version = get_directory_version()
+        last_modified = int(version)
+        scope = "staff" if request.user.is_staff else request.user.pk
+        etag_source = f"{version}|{scope}|{request.GET.urlencode()}"
+        etag = "W/" + quote_etag(hashlib.md5(etag_source.encode()).hexdigest())
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is not None:
+            return response
+
+        queryset = self.get_queryset()
+        page = self.paginate_queryset(queryset.only(*self.get_only_fields()))
+        serializer = self.get_serializer(page, many=True)
+        response = self.get_paginated_response(serializer.data)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class UserStatsView(APIView):
+    """Количество пользователей по ролям и статусам из таблицы счётчиков (только для персонала)."""
+
+    permission_classes = (IsActiveAndNotArchived, IsAdminUser)
+
+    def get(self, request):
+        return Response(get_user_stats())